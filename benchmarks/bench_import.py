@@ -0,0 +1,88 @@
+"""
+    Benchmark import time of coralinedb
+
+    Each statement is run in a fresh interpreter several times, and the median wall time is reported.
+    Run from repository root:
+        python benchmarks/bench_import.py
+        python benchmarks/bench_import.py --repeat 20 --importtime
+"""
+
+# import python packages
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+STATEMENTS = [
+    ("python", "pass"),
+    ("import coralinedb", "import coralinedb"),
+    ("import MySQLDB", "from coralinedb import MySQLDB"),
+    ("import PostgreSQLDB", "from coralinedb import PostgreSQLDB"),
+    ("import MSSQLDB", "from coralinedb import MSSQLDB"),
+]
+
+
+def measure(statement, repeat):
+    """
+    measure wall time of running a statement in a fresh interpreter
+    :param statement: python statement (str)
+    :param repeat: number of runs (int)
+    :return: list of seconds (list)
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], env=env, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def print_importtime(statement, top):
+    """
+    print the slowest modules reported by python -X importtime
+    :param statement: python statement (str)
+    :param top: number of modules to print (int)
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time: self [us] | cumulative | imported package"
+        _, cumulative_us, module = line.split("|", 2)
+        rows.append((int(cumulative_us), module))
+
+    print("  slowest imports (cumulative):")
+    for cumulative_us, module in sorted(rows, reverse=True)[:top]:
+        print("    %8.1f ms  %s" % (cumulative_us / 1000, module.strip()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark import time of coralinedb")
+    parser.add_argument("--repeat", type=int, default=10, help="number of runs per statement")
+    parser.add_argument("--importtime", action="store_true", help="print -X importtime breakdown")
+    parser.add_argument("--top", type=int, default=10, help="number of modules in breakdown")
+    args = parser.parse_args()
+
+    baseline = None
+    for label, statement in STATEMENTS:
+        try:
+            timings = measure(statement, args.repeat)
+        except subprocess.CalledProcessError:
+            print("%-22s failed (missing dependency?)" % label)
+            continue
+
+        median = statistics.median(timings)
+        if baseline is None:
+            baseline = median
+        print("%-22s median %7.1f ms  (+%7.1f ms over bare python)" % (label, median * 1000, (median - baseline) * 1000))
+
+        if args.importtime and statement != "pass":
+            print_importtime(statement, args.top)
@@ -1,7 +1,33 @@
-from coralinedb.coralinedb import BaseDB
-from coralinedb.coraline_mssql import MSSQLDB
-from coralinedb.coraline_mysql import MySQLDB
-from coralinedb.coraline_postgresql import PostgreSQLDB
+import importlib
 
 name = "coralinedb"
 
+# Public objects are imported on first access (PEP 562), so "import coralinedb"
+# does not pay for pandas, SQLAlchemy or database drivers until they are used
+_LAZY_ATTRIBUTES = {
+    'BaseDB': 'coralinedb.coralinedb',
+    'QueryTimeoutError': 'coralinedb.coralinedb',
+    'MSSQLDB': 'coralinedb.coraline_mssql',
+    'MySQLDB': 'coralinedb.coraline_mysql',
+    'PostgreSQLDB': 'coralinedb.coraline_postgresql',
+    'DuckDB': 'coralinedb.coraline_duckdb',
+    'copy_table': 'coralinedb.transfer',
+    'query_all': 'coralinedb.fanout',
+    'SpilledTable': 'coralinedb.spill',
+    'Appender': 'coralinedb.appender',
+    'AppenderFull': 'coralinedb.appender',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(attr):
+    if attr in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[attr]), attr)
+        globals()[attr] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, attr))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
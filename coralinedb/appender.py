@@ -0,0 +1,332 @@
+"""
+    Coraline DB Appender - Buffer small appends to a table and write them in bulk
+"""
+
+# import python packages
+import atexit
+import threading
+import time
+import pandas as pd
+
+
+class AppenderFull(Exception):
+    """
+    Raised when rows cannot be buffered before timeout because the buffer is full
+    """
+    pass
+
+
+class Appender:
+    """
+    Thread-safe write-behind appender of one table.
+    Dataframes from many producers are buffered, and a background thread writes them with
+    one save_table(if_exists='append') call when max_rows, max_bytes or max_latency is reached.
+    Producers are blocked when max_buffer_rows rows are waiting (backpressure).
+    Rows of a failed write are put back into the buffer and retried after retry_interval,
+    until they are written the error is raised by the next append(), flush() or close().
+    Remaining rows are written by close(), which is also called at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        db,
+        db_name: str,
+        table_name: str,
+        max_rows: int = 10000,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_latency: float = 1.0,
+        max_buffer_rows: int = 100000,
+        retry_interval: float = 1.0,
+        **kwargs):
+        """Initial appender and start its background thread
+
+        Parameters
+        ----------
+        db : BaseDB
+            database object
+        db_name : str
+            database name
+        table_name : str
+            table name
+        max_rows : int, optional
+            flush when this many rows are buffered, by default 10000
+        max_bytes : int, optional
+            flush when buffered dataframes use this many bytes, by default 16 MB
+        max_latency : float, optional
+            flush when the oldest buffered row waits this long (seconds), by default 1.0
+        max_buffer_rows : int, optional
+            block append() when this many rows are buffered, by default 100000
+        retry_interval : float, optional
+            seconds to wait before rows of a failed write are written again, by default 1.0
+        **kwargs: see BaseDB.save_table()
+        """
+        # Fastest insert path of backend (e.g. COPY on PostgreSQL)
+        if db.bulk_insert_method is not None:
+            kwargs.setdefault('method', db.bulk_insert_method)
+
+        self.db = db
+        self.db_name = db_name
+        self.table_name = table_name
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self.max_buffer_rows = max_buffer_rows
+        self.retry_interval = retry_interval
+        self.save_kwargs = kwargs
+
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.wake = threading.Condition(self.lock)
+        self.write_lock = threading.Lock()
+
+        self.frames = []
+        self.n_rows = 0
+        self.n_bytes = 0
+        self.oldest = None
+        self.retry_at = None
+        self.closed = False
+        self.error = None
+
+        # Metrics
+        self.started = time.monotonic()
+        self.rows_appended = 0
+        self.rows_flushed = 0
+        self.failed_rows = 0
+        self.failed_flushes = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.last_flush_seconds = None
+        self.max_flush_seconds = 0.0
+
+        self.thread = threading.Thread(target=self._run, name="coralinedb-appender-%s" % table_name, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, df: pd.DataFrame, timeout: float = None):
+        """Buffer rows to be written
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            rows to be appended
+        timeout : float, optional
+            maximum seconds to wait while buffer is full, by default None (wait forever)
+
+        Raises
+        ------
+        AppenderFull
+            buffer is still full after timeout
+        RuntimeError
+            appender is closed
+        Exception
+            error of the last failed write (its rows are still buffered, df is not appended)
+        """
+        self._raise_error()
+
+        if len(df) == 0:
+            return
+
+        n_bytes = int(df.memory_usage(index=False, deep=True).sum())
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self.lock:
+            # Backpressure, an oversized dataframe is accepted when the buffer is empty
+            while not self.closed and self.n_rows > 0 and self.n_rows + len(df) > self.max_buffer_rows:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise AppenderFull("buffer of %s is full" % self.table_name)
+                self.not_full.wait(remaining)
+
+            if self.closed:
+                raise RuntimeError("appender of %s is closed" % self.table_name)
+
+            self.frames.append(df)
+            self.n_rows += len(df)
+            self.n_bytes += n_bytes
+            self.rows_appended += len(df)
+            first = self.oldest is None
+            if first:
+                self.oldest = time.monotonic()
+
+            # Wake background thread to flush, or to start waiting for max_latency of the first rows
+            if first or self.n_rows >= self.max_rows or self.n_bytes >= self.max_bytes:
+                self.wake.notify()
+
+    def _is_due(self) -> bool:
+        """
+        check if buffered rows should be written, called with lock held
+        :return: True if a threshold is reached (bool)
+        """
+        if self.n_rows == 0:
+            return False
+        if self.retry_at is not None:
+            return self.closed or time.monotonic() >= self.retry_at
+        return (self.n_rows >= self.max_rows or self.n_bytes >= self.max_bytes
+                or time.monotonic() - self.oldest >= self.max_latency)
+
+    def _take(self) -> list:
+        """
+        take all buffered dataframes, called with lock held
+        :return: list of dataframes (list)
+        """
+        frames = self.frames
+        self.frames = []
+        self.n_rows = 0
+        self.n_bytes = 0
+        self.oldest = None
+        self.retry_at = None
+        return frames
+
+    def _put_back(self, frames: list):
+        """
+        put dataframes of a failed write back in front of the buffer, called with lock held
+        :param frames: list of dataframes (list)
+        """
+        self.frames = frames + self.frames
+        self.n_rows += sum(len(df) for df in frames)
+        self.n_bytes += sum(int(df.memory_usage(index=False, deep=True).sum()) for df in frames)
+        self.oldest = time.monotonic()
+        self.retry_at = self.oldest + self.retry_interval
+
+    def _write(self, frames: list) -> bool:
+        """
+        write dataframes with one save_table call, called with write_lock held.
+        If it fails, dataframes are put back in the buffer to be retried
+        :param frames: list of dataframes (list)
+        :return: True if rows were written (bool)
+        """
+        if not frames:
+            return True
+
+        df = pd.concat(frames, ignore_index=True)
+        started = time.perf_counter()
+        try:
+            self.db.save_table(df, self.db_name, self.table_name, if_exists='append', **self.save_kwargs)
+        except Exception as e:
+            print("Failed to append", len(df), "rows to", self.table_name, ", retrying in", self.retry_interval, "seconds:", e)
+            with self.lock:
+                self._put_back(frames)
+                self.error = e
+                self.failed_flushes += 1
+            return False
+        finally:
+            with self.lock:
+                # Buffer has space again (or rows were put back)
+                self.not_full.notify_all()
+
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            # Rows of failed writes are written now
+            self.error = None
+        self.flushes += 1
+        self.rows_flushed += len(df)
+        self.flush_seconds += elapsed
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        return True
+
+    def _run(self):
+        """
+        background thread, write buffered rows whenever a threshold is reached
+        """
+        while True:
+            with self.lock:
+                while not self.closed and not self._is_due():
+                    timeout = None
+                    if self.retry_at is not None:
+                        timeout = max(0.0, self.retry_at - time.monotonic())
+                    elif self.oldest is not None:
+                        timeout = max(0.0, self.oldest + self.max_latency - time.monotonic())
+                    self.wake.wait(timeout)
+
+                if self.closed and self.n_rows == 0:
+                    return
+
+            # Rows may have been taken by flush() meanwhile, then nothing is written
+            with self.write_lock:
+                with self.lock:
+                    frames = self._take()
+                written = self._write(frames)
+
+            # After close, rows are written once more, rows which still fail are kept in buffer
+            if self.closed and not written:
+                with self.lock:
+                    self.failed_rows = self.n_rows
+                return
+
+    def flush(self):
+        """Write buffered rows now
+
+        Raises
+        ------
+        Exception
+            error of the last failed write (its rows are still buffered)
+        """
+        with self.write_lock:
+            with self.lock:
+                frames = self._take()
+            self._write(frames)
+
+        self._raise_error()
+
+    def close(self):
+        """Stop accepting rows, write remaining rows and stop background thread.
+        Rows which cannot be written are kept in buffer (failed_rows in metrics())
+
+        Raises
+        ------
+        Exception
+            error of the last failed write
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.wake.notify_all()
+            self.not_full.notify_all()
+
+        self.thread.join()
+        atexit.unregister(self.close)
+        self._raise_error()
+
+    def _raise_error(self):
+        """
+        raise (and clear) error of the last failed write
+        """
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def metrics(self) -> dict:
+        """Get flush latency and throughput metrics
+
+        Returns
+        -------
+        dict
+            metrics of this appender
+        """
+        with self.lock:
+            buffered_rows = self.n_rows
+            buffered_bytes = self.n_bytes
+
+        elapsed = time.monotonic() - self.started
+        return {
+            "rows_appended": self.rows_appended,
+            "rows_flushed": self.rows_flushed,
+            "failed_rows": self.failed_rows,
+            "failed_flushes": self.failed_flushes,
+            "buffered_rows": buffered_rows,
+            "buffered_bytes": buffered_bytes,
+            "flushes": self.flushes,
+            "last_flush_seconds": self.last_flush_seconds,
+            "avg_flush_seconds": self.flush_seconds / self.flushes if self.flushes else None,
+            "max_flush_seconds": self.max_flush_seconds,
+            "rows_per_second": self.rows_flushed / elapsed if elapsed > 0 else None,
+            "flush_rows_per_second": self.rows_flushed / self.flush_seconds if self.flush_seconds > 0 else None,
+        }
@@ -0,0 +1,282 @@
+"""
+    Coraline DB Command Line - Dump databases to Parquet files and restore them
+
+    coralinedb dump mysql --host HOST --username USER --database DB --output ./backup --workers 8
+    coralinedb restore postgresql --host HOST --username USER --input ./backup --workers 8
+"""
+
+# import python packages
+import os
+import sys
+import json
+import argparse
+import getpass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import coralinedb
+
+BACKENDS = {
+    'mysql': 'MySQLDB',
+    'mssql': 'MSSQLDB',
+    'postgresql': 'PostgreSQLDB',
+}
+
+# Databases skipped by --all-databases
+SYSTEM_DATABASES = {
+    'information_schema', 'mysql', 'performance_schema', 'sys',
+    'master', 'tempdb', 'model', 'msdb',
+    'postgres', 'template0', 'template1',
+}
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def create_db(args):
+    """
+    create database object from command line arguments
+    :param args: parsed arguments
+    :return: database object
+    """
+    password = args.password
+    if password is None:
+        password = os.environ.get('CORALINEDB_PASSWORD')
+    if password is None:
+        password = getpass.getpass('Password: ')
+
+    db_class = getattr(coralinedb, BACKENDS[args.backend])
+    return db_class(args.host, args.username, password, args.port)
+
+
+def dump_table(engine, table_name, file_path, chunksize, compression):
+    """
+    stream a table into a Parquet file
+    :param engine: engine of database
+    :param table_name: table name (str)
+    :param file_path: path of Parquet file (str)
+    :param chunksize: number of rows per chunk (int)
+    :param compression: Parquet compression codec (str)
+    :return: manifest entry of the table (dict)
+    """
+    import pandas as pd
+    import sqlalchemy
+    from coralinedb.spill import write_parquet
+    from coralinedb.transfer import get_generic_type_name
+
+    reflected = [(col['name'], col['type']) for col in sqlalchemy.inspect(engine).get_columns(table_name)]
+    columns = [{'name': name, 'type': get_generic_type_name(column_type)} for name, column_type in reflected]
+
+    sql = 'SELECT * FROM %s' % engine.dialect.identifier_preparer.quote(table_name)
+    with engine.connect() as connection:
+        stream = connection.execution_options(stream_results=True)
+        chunks = pd.read_sql(sql, stream, coerce_float=True, chunksize=chunksize)
+        n_rows, schema = write_parquet(chunks, file_path, compression=compression, columns=reflected)
+
+    return {
+        'file': file_path if schema is not None else None,
+        'rows': n_rows,
+        'columns': columns,
+    }
+
+
+def restore_table(db, engine, table_name, entry, base_dir, batch_size, if_exists):
+    """
+    load a Parquet file into a table with the bulk insert path of backend
+    :param db: database object
+    :param engine: engine of database
+    :param table_name: table name (str)
+    :param entry: manifest entry of the table (dict)
+    :param base_dir: directory of manifest (str)
+    :param batch_size: number of rows per insert batch (int)
+    :param if_exists: how to behave if the table already exists (str)
+    :return: number of rows in table after restore (int)
+    """
+    import pandas as pd
+    from sqlalchemy import text
+    from coralinedb.spill import SpilledTable
+    from coralinedb.transfer import from_generic_type_name
+
+    # Create table with column types of manifest, unknown types are left to pandas
+    dtype = {}
+    for col in entry['columns']:
+        column_type = from_generic_type_name(col['type'])
+        if column_type is not None:
+            dtype[col['name']] = column_type
+
+    mode = if_exists
+    if entry['file'] is not None:
+        table = SpilledTable(os.path.join(base_dir, entry['file']), entry['rows'],
+                             [col['name'] for col in entry['columns']])
+        for df in table.iter_batches(batch_size=batch_size):
+            df.to_sql(table_name, engine, index=False, if_exists=mode, dtype=dtype, method=db.bulk_insert_method)
+            mode = 'append'
+
+    if mode == if_exists:
+        # Empty table, create it from column names
+        pd.DataFrame(columns=[col['name'] for col in entry['columns']]).to_sql(
+            table_name, engine, index=False, if_exists=mode, dtype=dtype)
+
+    with engine.connect() as connection:
+        sql = 'SELECT COUNT(*) FROM %s' % engine.dialect.identifier_preparer.quote(table_name)
+        return connection.execute(text(sql)).scalar()
+
+
+def dump(args) -> int:
+    """
+    dump command
+    :param args: parsed arguments
+    :return: exit code (int)
+    """
+    db = create_db(args)
+
+    if args.all_databases:
+        db_names = [name for name in db.get_databases() if name not in SYSTEM_DATABASES]
+    else:
+        db_names = args.database
+
+    manifest = {
+        'backend': args.backend,
+        'created_at': datetime.now().isoformat(),
+        'compression': args.compression,
+        'databases': {},
+    }
+
+    tasks = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for db_name in db_names:
+            tables = args.tables if args.tables else list(db.get_tables(db_name))
+            manifest['databases'][db_name] = {}
+            os.makedirs(os.path.join(args.output, db_name), exist_ok=True)
+
+            # One engine per database, its connection pool is shared by all workers
+            engine = db.get_engine(db_name)
+            for table_name in tables:
+                relative_path = os.path.join(db_name, '%s.parquet' % table_name)
+                future = executor.submit(dump_table, engine, table_name,
+                                         os.path.join(args.output, relative_path), args.chunksize, args.compression)
+                tasks[future] = (db_name, table_name, relative_path)
+
+        for future in as_completed(tasks):
+            db_name, table_name, relative_path = tasks[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                print("Failed to dump", db_name, table_name, ":", e)
+                failed += 1
+                continue
+
+            # Paths in manifest are relative to its directory
+            entry['file'] = relative_path if entry['file'] is not None else None
+            manifest['databases'][db_name][table_name] = entry
+            print("Dumped", db_name, table_name, entry['rows'], "rows")
+
+    with open(os.path.join(args.output, MANIFEST_FILE), 'w', encoding='utf8') as file:
+        json.dump(manifest, file, indent=2)
+
+    return 1 if failed else 0
+
+
+def restore(args) -> int:
+    """
+    restore command
+    :param args: parsed arguments
+    :return: exit code (int)
+    """
+    with open(os.path.join(args.input, MANIFEST_FILE), encoding='utf8') as file:
+        manifest = json.load(file)
+
+    db = create_db(args)
+
+    db_names = args.database if args.database else list(manifest['databases'])
+    if args.target_database and len(db_names) != 1:
+        print("--target-database requires exactly one database to restore")
+        return 2
+
+    tasks = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for db_name in db_names:
+            engine = db.get_engine(args.target_database or db_name)
+            for table_name, entry in manifest['databases'][db_name].items():
+                future = executor.submit(restore_table, db, engine, table_name, entry, args.input,
+                                         args.chunksize, args.if_exists)
+                tasks[future] = (db_name, table_name, entry['rows'])
+
+        for future in as_completed(tasks):
+            db_name, table_name, expected_rows = tasks[future]
+            try:
+                n_rows = future.result()
+            except Exception as e:
+                print("Failed to restore", db_name, table_name, ":", e)
+                failed += 1
+                continue
+
+            # Verify row count against manifest (existing rows are kept by append)
+            if args.if_exists != 'append' and n_rows != expected_rows:
+                print("Row count mismatch", db_name, table_name, ": expected", expected_rows, "got", n_rows)
+                failed += 1
+            else:
+                print("Restored", db_name, table_name, n_rows, "rows")
+
+    return 1 if failed else 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    create parser of command line arguments
+    :return: argument parser
+    """
+    parser = argparse.ArgumentParser(prog='coralinedb', description='Coraline Database Manager')
+    commands = parser.add_subparsers(dest='command')
+
+    def add_connection_arguments(command):
+        command.add_argument('backend', choices=sorted(BACKENDS), help='database backend')
+        command.add_argument('--host', required=True, help='host url')
+        command.add_argument('--username', required=True, help='username of database')
+        command.add_argument('--password', help='password of database (or env CORALINEDB_PASSWORD)')
+        command.add_argument('--port', help='port number')
+        command.add_argument('--workers', type=int, default=4, help='number of tables processed concurrently')
+        command.add_argument('--chunksize', type=int, default=50000, help='number of rows per chunk')
+
+    dump_command = commands.add_parser('dump', help='dump tables to Parquet files')
+    add_connection_arguments(dump_command)
+    source = dump_command.add_mutually_exclusive_group(required=True)
+    source.add_argument('--database', action='append', help='database to dump (can be repeated)')
+    source.add_argument('--all-databases', action='store_true', help='dump all non-system databases')
+    dump_command.add_argument('--tables', nargs='+', help='tables to dump, by default all tables')
+    dump_command.add_argument('--output', required=True, help='output directory')
+    dump_command.add_argument('--compression', default='zstd', help='Parquet compression codec')
+    dump_command.set_defaults(func=dump)
+
+    restore_command = commands.add_parser('restore', help='restore tables from Parquet files')
+    add_connection_arguments(restore_command)
+    restore_command.add_argument('--input', required=True, help='directory with manifest.json')
+    restore_command.add_argument('--database', action='append', help='database in manifest to restore (can be repeated)')
+    restore_command.add_argument('--target-database', help='restore a single database into another name')
+    restore_command.add_argument('--if-exists', default='replace', choices=['fail', 'replace', 'append'],
+                                 help='how to behave if a table already exists')
+    restore_command.set_defaults(func=restore)
+
+    return parser
+
+
+def main(argv: list = None):
+    """
+    entry point of coralinedb command
+    :param argv: command line arguments, by default sys.argv
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        from coralinedb.coralinedb import print_help
+        print_help()
+        parser.print_help()
+        return
+
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
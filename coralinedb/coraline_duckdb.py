@@ -0,0 +1,245 @@
+# import python packages
+import os
+import threading
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from coralinedb import BaseDB
+from coralinedb.slowlog import POSTGRESQL_STRING_LITERAL
+
+
+class DuckDB(BaseDB):
+    """
+    Class for DuckDB (embedded database, no server needed)
+    Each database is a <db_name>.duckdb file in directory, or one in-memory database if directory is None.
+    Dataframes can be registered as views without copying, so tables loaded from other backends
+    can be joined and aggregated locally by SQL.
+    Each pooled connection is its own cursor of one database instance, because duckdb connections
+    are not thread-safe (temporary tables are therefore visible to their connection only).
+    Requires: pip install duckdb duckdb_engine
+    """
+    # DuckDB follows PostgreSQL string syntax
+    string_literal_pattern = POSTGRESQL_STRING_LITERAL
+
+    # DuckDB parallelizes each insert internally, chunks are written one by one
+    parallel_write_workers = 1
+
+    def __init__(self, directory: str = None, **kwargs):
+        """Initial object by specify directory of database files
+
+        Parameters
+        ----------
+        directory : str, optional
+            directory of database files, by default None (in-memory database)
+        **kwargs: see BaseDB.__init__() (e.g. timeout, single_flight)
+        """
+        # Registered dataframes of each engine, applied to pooled connections on checkout
+        # (set before BaseDB.__init__(), which copies this object for replicas)
+        self.registered = {}
+        self.registered_version = {}
+        self.registered_lock = threading.Lock()
+
+        super().__init__(directory if directory is not None else ":memory:", "", "", None, **kwargs)
+
+    def load_driver(self):
+        """
+        Import duckdb and its SQLAlchemy dialect (duckdb_engine)
+        """
+        try:
+            import duckdb
+            import duckdb_engine
+        except ImportError:
+            raise ImportError("duckdb and duckdb_engine are required, please run: pip install duckdb duckdb_engine")
+
+    def get_engine_url(self, db_name: str) -> str:
+        """Get engine URL for DuckDB
+
+        Parameters
+        ----------
+        db_name : str
+            database name (file name without .duckdb)
+
+        Returns
+        -------
+        str
+            engine url
+        """
+        if self.host == ":memory:":
+            return "duckdb:///:memory:"
+
+        return "duckdb:///" + os.path.join(self.host, "%s.duckdb" % (db_name or "main"))
+
+    def get_engine(self, db_name: str = "", engine_url: str = ""):
+        """Get engine of a database, the engine is created once and kept, because an in-memory
+        database lives only as long as its engine
+
+        Parameters
+        ----------
+        db_name : str, optional
+            database name, by default ""
+        engine_url : str, optional
+            customize engine url, by default ""
+
+        Returns
+        -------
+        engine
+            engine whose pooled connections are cursors of one database instance
+        """
+        engine_key = self._get_engine_key(db_name)
+
+        if engine_key not in self.engines:
+            if engine_url == "":
+                engine_url = self.get_engine_url(db_name)
+            self.load_driver()
+            self.engines[engine_key] = self._create_engine(engine_key, engine_url)
+
+        return self.engines[engine_key]
+
+    def _get_engine_key(self, db_name: str = None) -> str:
+        """
+        get key of engine in self.engines
+        :param db_name: database name (str)
+        :return: engine key (str)
+        """
+        if self.host == ":memory:":
+            # All names refer to the same in-memory database
+            return "_"
+        return db_name if db_name else "_"
+
+    def _create_engine(self, engine_key: str, engine_url: str):
+        """
+        create engine which gives every pooled connection its own cursor of one database instance,
+        so each thread works on its own duckdb connection
+        :param engine_key: engine key (str)
+        :param engine_url: engine url (str)
+        :return: engine
+        """
+        import duckdb
+        from duckdb_engine import ConnectionWrapper
+
+        # The database instance lives as long as this connection (the engine)
+        database = duckdb.connect(make_url(engine_url).database or ":memory:")
+        database_lock = threading.Lock()
+
+        # Unlimited overflow, a thread may check out more than one connection at a time
+        engine = create_engine(engine_url, poolclass=QueuePool, pool_size=5, max_overflow=-1)
+        self.registered.setdefault(engine_key, {})
+        self.registered_version.setdefault(engine_key, 0)
+
+        @event.listens_for(engine, "do_connect")
+        def connect(dialect, connection_record, cargs, cparams):
+            with database_lock:
+                return ConnectionWrapper(database.cursor())
+
+        @event.listens_for(engine, "checkout")
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            self._sync_registered(engine_key, dbapi_connection, connection_record.info)
+
+        return engine
+
+    def _sync_registered(self, engine_key: str, dbapi_connection, info: dict):
+        """
+        register (and unregister) dataframes on a pooled connection, if registrations changed since its last checkout
+        :param engine_key: engine key (str)
+        :param dbapi_connection: duckdb connection
+        :param info: info dict of pooled connection (dict)
+        """
+        with self.registered_lock:
+            version = self.registered_version[engine_key]
+            if info.get("registered_version") == version:
+                return
+            registered = dict(self.registered[engine_key])
+
+        views = info.setdefault("registered", {})
+        for table_name in [name for name in views if name not in registered]:
+            dbapi_connection.unregister(table_name)
+            del views[table_name]
+        for table_name, df in registered.items():
+            if views.get(table_name) is not df:
+                dbapi_connection.register(table_name, df)
+                views[table_name] = df
+
+        info["registered_version"] = version
+
+    def get_databases(self):
+        """
+        list of all databases (.duckdb files) in directory
+        :return: list of database names
+        """
+        if self.host == ":memory:":
+            return ["memory"]
+
+        return sorted(f[:-len(".duckdb")] for f in os.listdir(self.host) if f.endswith(".duckdb"))
+
+    def get_tables(self, db_name: str = None):
+        """
+        List all tables and views (including registered dataframes) in database
+        :param db_name: database name (str)
+        :return: list of table names
+        """
+        # Create Connection
+        _, connection = self.create_connection(db_name)
+
+        sql = 'SELECT table_name FROM information_schema.tables;'
+        result = pd.read_sql(text(sql), connection).iloc[:, 0].values
+
+        # Close Connection
+        connection.close()
+
+        return result
+
+    def register(self, df: pd.DataFrame, table_name: str, db_name: str = None):
+        """Register a dataframe as a view without copying its data.
+        The view is visible to connections checked out afterwards (an open session keeps its registrations)
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            dataframe, it must be kept alive (and unchanged) while the view is used
+        table_name : str
+            view name
+        db_name : str, optional
+            database name, by default None
+        """
+        engine_key = self._get_engine_key(db_name)
+        self.get_engine(db_name or "")
+
+        with self.registered_lock:
+            self.registered[engine_key][table_name] = df
+            self.registered_version[engine_key] += 1
+
+    def unregister(self, table_name: str, db_name: str = None):
+        """Remove a view of registered dataframe
+
+        Parameters
+        ----------
+        table_name : str
+            view name
+        db_name : str, optional
+            database name, by default None
+        """
+        engine_key = self._get_engine_key(db_name)
+        self.get_engine(db_name or "")
+
+        with self.registered_lock:
+            if self.registered[engine_key].pop(table_name, None) is not None:
+                self.registered_version[engine_key] += 1
+
+    def build_sample_sql(self, db_name: str, table_name: str, fraction: float, method: str = 'system') -> str:
+        """
+        Build SELECT statement with USING SAMPLE (system: vectors, bernoulli: rows)
+        :param db_name: database name (str)
+        :param table_name: table name (str)
+        :param fraction: fraction of rows to sample (0 - 1] (float)
+        :param method: 'system' or 'bernoulli' (str)
+        :return: SQL statement (str)
+        """
+        return 'SELECT * FROM %s USING SAMPLE %f PERCENT (%s)' % (table_name, fraction * 100, method)
+
+    def cancel_connection(self, dbapi_connection):
+        """
+        Cancel running statement by interrupting duckdb connection
+        :param dbapi_connection: duckdb connection running the statement
+        """
+        dbapi_connection.interrupt()
@@ -1,4 +1,5 @@
 import pandas as pd
+from sqlalchemy import text
 from coralinedb import BaseDB
 
 
@@ -61,3 +62,93 @@ class MSSQLDB(BaseDB):
 
         return result
 
+    def estimate_row_count(self, db_name: str, table_name: str) -> int:
+        """
+        Estimate number of rows from sys.dm_db_partition_stats (heap or clustered index)
+        :param db_name: database name (str)
+        :param table_name: table name, can be prefixed by schema (str)
+        :return: number of rows
+        """
+        # Create Connection
+        _, connection = self.create_connection(db_name)
+
+        sql = ('SELECT SUM(row_count) FROM sys.dm_db_partition_stats '
+               'WHERE object_id = OBJECT_ID(:table_name) AND index_id IN (0, 1);')
+        n_rows = connection.execute(text(sql), {'table_name': table_name}).scalar()
+
+        # Close Connection
+        connection.close()
+
+        return int(n_rows) if n_rows is not None else self.get_count(db_name, table_name)
+
+    def build_sample_sql(self, db_name: str, table_name: str, fraction: float, method: str = 'system') -> str:
+        """
+        Build SELECT statement which samples a table. SQL Server supports only page sampling
+        by TABLESAMPLE, so bernoulli sampling filters each row by a random checksum
+        :param db_name: database name (str)
+        :param table_name: table name (str)
+        :param fraction: fraction of rows to sample (0 - 1] (float)
+        :param method: 'system' or 'bernoulli' (str)
+        :return: SQL statement (str)
+        """
+        if method == 'system':
+            return 'SELECT * FROM %s TABLESAMPLE SYSTEM (%f PERCENT)' % (table_name, fraction * 100)
+
+        return 'SELECT * FROM %s WHERE ABS(CHECKSUM(NEWID())) / 2147483647.0 < %f' % (table_name, fraction)
+
+    def build_limit_sql(self, sql_statement: str, n_rows: int) -> str:
+        """
+        Limit number of rows of an ordered SELECT statement by OFFSET ... FETCH (SQL Server 2012+)
+        :param sql_statement: SELECT statement with ORDER BY (str)
+        :param n_rows: maximum number of rows (int)
+        :return: SQL statement (str)
+        """
+        return '%s OFFSET 0 ROWS FETCH NEXT %d ROWS ONLY' % (sql_statement, n_rows)
+
+    def cancel_connection(self, dbapi_connection):
+        """
+        Cancel running statement by sending attention signal of pymssql connection
+        :param dbapi_connection: pymssql connection running the statement
+        """
+        dbapi_connection._conn.cancel()
+
+    def explain(self, sql_statement: str, db_name: str = None, **kwargs) -> pd.DataFrame:
+        """Get query plan of a SELECT statement by SET SHOWPLAN_TEXT ON
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        db_name : str, optional
+            database name, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            query plan
+        """
+        # Create Connection
+        _, connection = self.create_connection(db_name, raw=True)
+
+        try:
+            cursor = connection.cursor()
+
+            # SHOWPLAN_TEXT must be the only statement in its batch
+            cursor.execute('SET SHOWPLAN_TEXT ON')
+            try:
+                # Statement is compiled, not executed, while SHOWPLAN_TEXT is on
+                cursor.execute(sql_statement, kwargs.get('params'))
+                rows = []
+                while True:
+                    if cursor.description is not None:
+                        rows.extend(row[0] for row in cursor.fetchall())
+                    if not cursor.nextset():
+                        break
+            finally:
+                cursor.execute('SET SHOWPLAN_TEXT OFF')
+            cursor.close()
+        finally:
+            # Close connection
+            connection.close()
+
+        return pd.DataFrame({'StmtText': rows})
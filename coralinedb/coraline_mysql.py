@@ -1,14 +1,36 @@
 # import python packages
+import math
+import random
 import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+from sqlalchemy.types import Integer
 from coralinedb import BaseDB
-import pymysql
-pymysql.install_as_MySQLdb()
+from coralinedb.slowlog import MYSQL_STRING_LITERAL
 
 
 class MySQLDB(BaseDB):
     """
     Class for MySQL Database
     """
+    string_literal_pattern = MYSQL_STRING_LITERAL
+
+    def load_driver(self):
+        """
+        Import pymysql and register it as MySQLdb, which is used by mysql:// engine url
+        """
+        import pymysql
+        pymysql.install_as_MySQLdb()
+
+    def get_streaming_cursor(self, dbapi_connection):
+        """
+        Get unbuffered cursor (pymysql SSCursor), rows are read from server by fetchmany()
+        instead of being loaded into memory on execute()
+        :param dbapi_connection: pymysql connection
+        :return: pymysql SSCursor
+        """
+        import pymysql.cursors
+        return dbapi_connection.cursor(pymysql.cursors.SSCursor)
 
     def get_engine_url(self, db_name: str) -> str:
         """Get engine URL for MySQL
@@ -65,3 +87,116 @@ class MySQLDB(BaseDB):
 
         return result
 
+    def estimate_row_count(self, db_name: str, table_name: str) -> int:
+        """
+        Estimate number of rows from information_schema.tables (approximate for InnoDB)
+        :param db_name: database name (str)
+        :param table_name: table name (str)
+        :return: estimated number of rows
+        """
+        # Create Connection
+        _, connection = self.create_connection(db_name)
+
+        sql = 'SELECT TABLE_ROWS FROM information_schema.tables WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name;'
+        n_rows = connection.execute(text(sql), {'table_name': table_name}).scalar()
+
+        # Close Connection
+        connection.close()
+
+        return int(n_rows) if n_rows is not None else self.get_count(db_name, table_name)
+
+    def build_sample_sql(self, db_name: str, table_name: str, fraction: float, method: str = 'system') -> str:
+        """
+        Build SELECT statement which samples a table. MySQL has no TABLESAMPLE, so system sampling
+        reads short primary key ranges from random start keys (needs single integer primary key),
+        and bernoulli sampling filters each row by RAND()
+        :param db_name: database name (str)
+        :param table_name: table name (str)
+        :param fraction: fraction of rows to sample (0 - 1] (float)
+        :param method: 'system' or 'bernoulli' (str)
+        :return: SQL statement (str)
+        """
+        bernoulli_sql = 'SELECT * FROM %s WHERE RAND() < %f' % (table_name, fraction)
+        if method != 'system' or fraction >= 1:
+            return bernoulli_sql
+
+        # Create Connection
+        _, connection = self.create_connection(db_name)
+
+        try:
+            inspector = inspect(connection)
+            key_columns = inspector.get_pk_constraint(table_name).get('constrained_columns') or []
+            if len(key_columns) != 1:
+                return bernoulli_sql
+
+            key = key_columns[0]
+            key_type = [col['type'] for col in inspector.get_columns(table_name) if col['name'] == key][0]
+            if not isinstance(key_type, Integer):
+                return bernoulli_sql
+
+            sql = 'SELECT MIN(`%s`), MAX(`%s`) FROM %s;' % (key, key, table_name)
+            min_key, max_key = connection.execute(text(sql)).fetchone()
+        finally:
+            # Close Connection
+            connection.close()
+
+        if min_key is None:
+            return bernoulli_sql
+
+        # Split sample into at most 100 ranges of consecutive keys
+        n_sample = max(1, int(self.estimate_row_count(db_name, table_name) * fraction))
+        n_ranges = min(100, math.ceil(n_sample / 1000))
+        range_rows = math.ceil(n_sample / n_ranges)
+
+        ranges = ['(SELECT * FROM %s WHERE `%s` >= %d ORDER BY `%s` LIMIT %d)'
+                  % (table_name, key, random.randint(min_key, max_key), key, range_rows)
+                  for _ in range(n_ranges)]
+
+        # UNION removes rows of overlapping ranges
+        return ' UNION '.join(ranges)
+
+    def get_timeout_statement(self, timeout: float, sql_statement: str = None) -> str:
+        """
+        Get statement which sets MAX_EXECUTION_TIME of the session, it applies to SELECT only,
+        so other statements are cancelled by KILL QUERY from watchdog
+        :param timeout: timeout in seconds, 0 means no timeout (float)
+        :param sql_statement: statement which will be run with the timeout (str)
+        :return: SQL statement or None
+        """
+        if sql_statement is None or not sql_statement.lstrip().lower().startswith('select'):
+            return None
+
+        return 'SET SESSION MAX_EXECUTION_TIME = %d' % int(timeout * 1000)
+
+    def cancel_connection(self, dbapi_connection):
+        """
+        Cancel running statement by KILL QUERY from another connection
+        :param dbapi_connection: pymysql connection running the statement
+        """
+        # Separate engine, so engines of this object are not disposed while the query is running
+        engine = create_engine(self.get_engine_url(''), poolclass=NullPool)
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('KILL QUERY %d' % dbapi_connection.thread_id())
+            cursor.close()
+        finally:
+            connection.close()
+
+    def get_replication_lag(self, connection):
+        """
+        Get replication lag from Seconds_Behind_Source of SHOW REPLICA STATUS
+        (Seconds_Behind_Master of SHOW SLAVE STATUS before MySQL 8.0.22, it is removed in 8.4)
+        :param connection: connection to replica
+        :return: lag in seconds or None if it is unknown
+        """
+        try:
+            status = connection.execute(text('SHOW REPLICA STATUS;')).fetchone()
+        except Exception:
+            status = connection.execute(text('SHOW SLAVE STATUS;')).fetchone()
+        if status is None:
+            return None
+
+        status = dict(status._mapping if hasattr(status, '_mapping') else status)
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
@@ -1,12 +1,64 @@
 # import python packages
+import io
+import time
 import pandas as pd
+from sqlalchemy import text
 from coralinedb import BaseDB
+from coralinedb.coralinedb import QueryTimeoutError
+from coralinedb.replicas import read_only
+from coralinedb.singleflight import deduplicate
+from coralinedb.slowlog import POSTGRESQL_STRING_LITERAL
+
+
+def format_copy_value(value) -> str:
+    """
+    format a value as field of COPY CSV, NULL is written as \\N and every other value is quoted,
+    so empty strings are not loaded as NULL
+    :param value: value of a row
+    :return: CSV field (str)
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return '\\N'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 63:
+        # Integer columns with NULLs are read as float, COPY into an integer column rejects "1.0"
+        value = int(value)
+    return '"%s"' % str(value).replace('"', '""')
+
+
+def copy_insert(table, conn, keys, data_iter):
+    """
+    insert rows by COPY FROM STDIN, used as method of DataFrame.to_sql()
+    :param table: pandas SQLTable
+    :param conn: SQLAlchemy connection
+    :param keys: column names (list)
+    :param data_iter: iterable of rows
+    """
+    buffer = io.StringIO()
+    for row in data_iter:
+        buffer.write(','.join(format_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    columns = ', '.join('"%s"' % key for key in keys)
+    table_name = '"%s"."%s"' % (table.schema, table.name) if table.schema else '"%s"' % table.name
+
+    dbapi_connection = conn.connection
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.copy_expert("COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL '\\N')" % (table_name, columns), buffer)
+    finally:
+        cursor.close()
 
 
 class PostgreSQLDB(BaseDB):
     """
     Class for PostgreSQL Database
+    Note: psycopg2 loads results of procedures into memory on execute() (only named cursors of
+    SELECT stream from server), so call_procedure_stream() only bounds the size of each dataframe
     """
+    bulk_insert_method = staticmethod(copy_insert)
+    string_literal_pattern = POSTGRESQL_STRING_LITERAL
+
     def get_engine_url(self, db_name: str) -> str:
         """get engine URL
 
@@ -27,7 +79,154 @@ class PostgreSQLDB(BaseDB):
         return f"postgresql://{self.username}:{self.passwd}@{self.host}:{self.port}/{db_name}"
 
 
-    def load_table(self, db_name: str, table_name: str) -> pd.DataFrame:
+    def get_health_check_db(self) -> str:
+        """Get database connected by replica health checks, the maintenance database always exists
+        (without database name, libpq connects to the database named after the user)
+
+        Returns
+        -------
+        str
+            database name
+        """
+        return 'postgres'
+
+
+    def get_databases(self):
+        """
+        list of all databases on this host which accept connections (templates are excluded)
+        :return: list of database names
+        """
+        # Create Connection, to maintenance database which always exists
+        engine, connection = self.create_connection('postgres')
+
+        # Get result
+        sql = 'SELECT datname FROM pg_database WHERE datallowconn AND NOT datistemplate ORDER BY datname;'
+        result = pd.read_sql(sql, connection, coerce_float=True).iloc[:, 0].values
+
+        # Close Connection
+        connection.close()
+
+        return result
+
+
+    def get_tables(self, db_name: str):
+        """
+        List all tables in current schema (public by default) of database
+        :param db_name:  database name (str)
+        :return: list of table names
+        """
+        # Create Connection
+        _, connection = self.create_connection(db_name)
+
+        sql = "SELECT table_name FROM information_schema.tables " \
+              "WHERE table_schema = current_schema() AND table_type = 'BASE TABLE' ORDER BY table_name;"
+        result = pd.read_sql(sql, connection, coerce_float=True).iloc[:, 0].values
+
+        # Close Connection
+        connection.close()
+
+        return result
+
+
+    def build_sample_sql(self, db_name: str, table_name: str, fraction: float, method: str = 'system') -> str:
+        """Build SELECT statement with TABLESAMPLE SYSTEM (pages) or BERNOULLI (rows)
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        fraction : float
+            fraction of rows to sample (0 - 1]
+        method : str, optional
+            'system' or 'bernoulli', by default 'system'
+
+        Returns
+        -------
+        str
+            SQL statement
+        """
+        return 'SELECT * FROM %s TABLESAMPLE %s (%f)' % (table_name, method.upper(), fraction * 100)
+
+
+    def get_timeout_statement(self, timeout: float, sql_statement: str = None) -> str:
+        """Get statement which sets statement_timeout of the session
+
+        Parameters
+        ----------
+        timeout : float
+            timeout in seconds, 0 means no timeout
+        sql_statement : str, optional
+            statement which will be run with the timeout, by default None
+
+        Returns
+        -------
+        str
+            SQL statement
+        """
+        return 'SET statement_timeout = %d' % int(timeout * 1000)
+
+
+    def get_replication_lag(self, connection):
+        """Get replication lag from the last replayed transaction on standby
+
+        Parameters
+        ----------
+        connection : Connection
+            connection to replica
+
+        Returns
+        -------
+        float or None
+            lag in seconds, None if it is unknown (e.g. not a standby)
+        """
+        sql = 'SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp());'
+        lag = connection.execute(text(sql)).scalar()
+        return float(lag) if lag is not None else None
+
+
+    def estimate_row_count(self, db_name: str, table_name: str) -> int:
+        """Estimate number of rows from pg_class.reltuples (updated by VACUUM and ANALYZE)
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name (can be prefixed by schema)
+
+        Returns
+        -------
+        int
+            estimated number of rows
+        """
+        # Create Connection
+        _, connection = self.create_connection(db_name)
+
+        try:
+            sql = 'SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table_name);'
+            n_rows = connection.execute(text(sql), {'table_name': table_name}).scalar()
+        finally:
+            # Close connection
+            connection.close()
+
+        # reltuples is -1 (or 0 on old versions) for tables which were never analyzed
+        if n_rows is None or n_rows <= 0:
+            return self.get_count(db_name, table_name)
+
+        return int(n_rows)
+
+
+    @deduplicate
+    @read_only
+    def load_table(
+        self,
+        db_name: str,
+        table_name: str,
+        memory_budget: int = None,
+        spill_dir: str = None,
+        timeout: float = None) -> pd.DataFrame:
         """Load a table from database
 
         Parameters
@@ -36,20 +235,39 @@ class PostgreSQLDB(BaseDB):
             database name
         table_name : str
             table name
+        memory_budget : int, optional
+            memory budget in bytes. If the estimated size of table exceeds it, the table is read
+            in chunks into a Parquet file and SpilledTable is returned instead, by default None
+        spill_dir : str, optional
+            directory of spilled file, by default system temp directory
+        timeout : float, optional
+            timeout in seconds, by default timeout of this object
 
         Returns
         -------
-        pd.DataFrame
+        pd.DataFrame or SpilledTable
             loaded table
         """
+        if memory_budget is not None:
+            sql = 'SELECT * FROM %s' % table_name
+            spilled = self._load_table_within_budget(db_name, table_name, sql, memory_budget, spill_dir)
+            if spilled is not None:
+                return spilled
+
 
         # Create Connection
         _, connection = self.create_connection(db_name)
+        started = time.perf_counter()
 
         # Check if table exists and read
         try:
             sql = 'SELECT * FROM %s' % table_name
-            result = pd.read_sql(sql, connection, coerce_float=True)
+            with self._enforce_timeout(connection, timeout, sql):
+                result = pd.read_sql(sql, connection, coerce_float=True)
+            self._log_query(sql, db_name, started, len(result))
+        except QueryTimeoutError:
+            connection.close()
+            raise
         except Exception as e:
             print(e)
             result = None
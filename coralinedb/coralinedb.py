@@ -4,8 +4,31 @@
 
 # import python packages
 import pandas as pd
+import sqlalchemy
 from sqlalchemy import create_engine
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import tempfile
+import threading
 import time
+import uuid
+from coralinedb.session import Session
+from coralinedb.replicas import ReplicaSet, read_only
+from coralinedb.slowlog import SlowQueryLog, STANDARD_STRING_LITERAL
+from coralinedb.spill import SpilledTable, write_parquet
+from coralinedb.singleflight import deduplicate
+from coralinedb.fanout import iter_query_all
+from coralinedb.pagination import KeysetPaginator
+from coralinedb.appender import Appender
+from coralinedb.utils import get_sqlalchemy_datatype_from_dtypes, convert_df_to_sqlalchemy_datatype
+
+
+class QueryTimeoutError(Exception):
+    """
+    Raised when a query is cancelled because it runs longer than its timeout
+    """
+    pass
 
 
 class BaseDB:
@@ -21,36 +44,81 @@ class BaseDB:
     passwd = ""
     port = None
     engines = {}
+    replica_set = None
+    slow_query_log = None
+    single_flight = False
+    timeout = None
+    schema_cache = {}
+
+    # Parallel save_table settings, can be tuned by sub-class or object
+    parallel_write_workers = 4
+    parallel_write_chunksize = 10000
+
+    # Fastest insert path of the backend, passed as method of DataFrame.to_sql() for bulk loads
+    bulk_insert_method = None
+
+    # String literals of the SQL dialect, redacted from slow query log
+    string_literal_pattern = STANDARD_STRING_LITERAL
 
     def __init__(
         self, 
         host: str, 
         username: str, 
         passwd: str, 
-        port: str = None):
+        port: str = None,
+        timeout: float = None,
+        single_flight: bool = False,
+        replicas: list = None,
+        routing: str = 'round_robin',
+        max_replica_lag: float = None,
+        health_check_interval: float = 30):
         """Initial object by specify host username and password for database connection
 
         Parameters
         ----------
         host : str
-            host url
+            host url (primary host if replicas are given)
         username : str
             username of database
         passwd : str
             password of database
         port : str, optional
             port number, by default None
+        timeout : float, optional
+            default timeout (seconds) of query, load_table and execute, by default None (no timeout)
+        single_flight : bool, optional
+            run concurrent identical query and load_table calls (same host, database, SQL and
+            parameters) only once, each caller gets its own copy of the result, by default False
+        replicas : list, optional
+            read replica hosts, each item is host (str) or (host, port) tuple.
+            load_table, load_tables, query and get_count are routed to replicas, by default None
+        routing : str, optional
+            replica routing, 'round_robin' or 'least_outstanding', by default 'round_robin'
+        max_replica_lag : float, optional
+            skip replicas lagging behind primary more than this (seconds), by default None
+        health_check_interval : float, optional
+            seconds between health checks of each replica, by default 30
         """
         self.host = host
         self.username = username
         self.passwd = passwd
         self.port = port
         self.engines = {}
+        self.schema_cache = {}
+        self.timeout = timeout
+        self.single_flight = single_flight
+        self.replica_set = None
+        if replicas:
+            self.replica_set = ReplicaSet(self, replicas, routing=routing, max_replica_lag=max_replica_lag,
+                                          health_check_interval=health_check_interval)
 
     def __del__(self):
         """
         On object deleted
         """
+        if self.replica_set is not None:
+            self.replica_set.close()
+
         for en_key in self.engines:
             engine = self.engines[en_key]
             try:
@@ -102,8 +170,193 @@ class BaseDB:
             this function must be overriden
         """
         raise NotImplementedError()
+
+
+    def estimate_row_count(
+        self,
+        db_name: str,
+        table_name: str) -> int:
+        """Estimate number of rows of a table. Sub-class can override this to read
+        the estimate from catalog instead of counting rows
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+
+        Returns
+        -------
+        int
+            number of rows
+        """
+        return self.get_count(db_name, table_name)
+
+    def estimate_table_size(
+        self,
+        db_name: str,
+        table_name: str) -> tuple:
+        """Estimate number of rows and in-memory size of a table loaded as dataframe
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name (can be prefixed by schema)
+
+        Returns
+        -------
+        tuple
+            number of rows and estimated size in bytes
+        """
+        # Create Connection
+        engine, connection = self.create_connection(db_name)
+
+        try:
+            schema, _, name = table_name.rpartition('.')
+            columns = sqlalchemy.inspect(connection).get_columns(name, schema=schema or None)
+        finally:
+            # Close connection
+            connection.close()
+
+        row_width = sum(_estimate_column_width(col['type']) for col in columns)
+        n_rows = self.estimate_row_count(db_name, table_name) or 0
+
+        return int(n_rows), int(n_rows * row_width)
+
+    def get_timeout_statement(
+        self,
+        timeout: float,
+        sql_statement: str = None) -> str:
+        """Get statement which sets server-side timeout of following statements on a connection.
+        Sub-class should override this if the dialect supports it
+
+        Parameters
+        ----------
+        timeout : float
+            timeout in seconds, 0 means no timeout
+        sql_statement : str, optional
+            statement which will be run with the timeout, by default None
+
+        Returns
+        -------
+        str or None
+            SQL statement or None if server-side timeout is not supported (client-side cancel is used)
+        """
+        return None
+
+    def build_sample_sql(
+        self,
+        db_name: str,
+        table_name: str,
+        fraction: float,
+        method: str = 'system') -> str:
+        """Build SELECT statement which samples a table on server side.
+        This will depend on database, so this function must be overriden by subclass
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        fraction : float
+            fraction of rows to sample (0 - 1]
+        method : str, optional
+            'system' (sample pages or key ranges) or 'bernoulli' (sample each row), by default 'system'
+
+        Raises
+        ------
+        NotImplementedError
+            this function must be overriden
+        """
+        raise NotImplementedError()
+
+    def build_limit_sql(
+        self,
+        sql_statement: str,
+        n_rows: int) -> str:
+        """Limit number of rows of an ordered SELECT statement. Sub-class should override this
+        if the dialect does not support LIMIT
+
+        Parameters
+        ----------
+        sql_statement : str
+            SELECT statement (with ORDER BY)
+        n_rows : int
+            maximum number of rows
+
+        Returns
+        -------
+        str
+            SQL statement
+        """
+        return '%s LIMIT %d' % (sql_statement, n_rows)
+
+    def cancel_connection(self, dbapi_connection):
+        """Cancel running statement of a DBAPI connection, called by timeout watchdog thread.
+        Sub-class can override this if the driver cancels queries in another way
+
+        Parameters
+        ----------
+        dbapi_connection : object
+            DBAPI connection
+        """
+        dbapi_connection.cancel()
+
+    def get_replication_lag(self, connection):
+        """Get replication lag of the connected replica. Sub-class can override this
+        to support max_replica_lag
+
+        Parameters
+        ----------
+        connection : Connection
+            connection to replica
+
+        Returns
+        -------
+        float or None
+            lag in seconds, None if it is unknown
+        """
+        return None
+
+    def get_streaming_cursor(self, dbapi_connection):
+        """Get cursor which fetches rows from server as they are read (unbuffered), used by
+        call_procedure_stream(). Sub-class can override this if the default cursor of the driver
+        loads the whole result on execute()
+
+        Parameters
+        ----------
+        dbapi_connection : object
+            DBAPI connection
+
+        Returns
+        -------
+        object
+            DBAPI cursor
+        """
+        return dbapi_connection.cursor()
+
+    def get_health_check_db(self) -> str:
+        """Get database connected by replica health checks. Sub-class can override this
+        if connecting without database name fails
+
+        Returns
+        -------
+        str
+            database name, by default "" (default database of user)
+        """
+        return ""
     #########################################################
 
+    def load_driver(self):
+        """Import database driver before the first engine is created.
+        Sub-class can override this to defer expensive driver imports until it is used
+        """
+        pass
+
     def get_engine(
         self, 
         db_name: str = "", 
@@ -136,6 +389,7 @@ class BaseDB:
             engine_url = self.get_engine_url(db_name)
 
         # Create a new one
+        self.load_driver()
         self.engines[engine_key] = create_engine(engine_url)
 
         return self.engines[engine_key]
@@ -188,10 +442,271 @@ class BaseDB:
                 max_tries -= 1
 
 
+    @contextmanager
+    def session(
+        self,
+        db_name: str = None,
+        transaction: bool = False):
+        """Open a session which reuses one connection for multiple calls
+
+        Parameters
+        ----------
+        db_name : str, optional
+            database name, by default None
+        transaction : bool, optional
+            run all calls in one transaction which is committed when the block exits
+            and rolled back on exception, by default False
+
+        Yields
+        ------
+        Session
+            session object with load_table, load_tables, query, save_table, execute
+            and call_procedure methods
+        """
+        session = Session(self, db_name, transaction=transaction)
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+    def enable_slow_query_log(
+        self,
+        threshold: float = 1.0,
+        explain: bool = True,
+        max_records: int = 1000) -> SlowQueryLog:
+        """Record query, load_table and execute calls slower than threshold
+
+        Parameters
+        ----------
+        threshold : float, optional
+            minimum duration in seconds, by default 1.0
+        explain : bool, optional
+            capture EXPLAIN plan of slow SELECT statements in background, by default True
+        max_records : int, optional
+            keep only the latest max_records records, by default 1000
+
+        Returns
+        -------
+        SlowQueryLog
+            slow query log, see SlowQueryLog.records() and SlowQueryLog.dump_jsonl()
+        """
+        self.slow_query_log = SlowQueryLog(threshold=threshold, explain=explain, max_records=max_records)
+
+        # Replicas are copies of this object, they share the same log
+        if self.replica_set is not None:
+            for member in self.replica_set.members:
+                member.slow_query_log = self.slow_query_log
+
+        return self.slow_query_log
+
+    def _log_query(
+        self,
+        sql_statement,
+        db_name: str,
+        started: float,
+        n_rows: int = None,
+        params=None):
+        """Pass a finished call to slow query log (if enabled)
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        db_name : str
+            database name
+        started : float
+            time.perf_counter() when the call started
+        n_rows : int, optional
+            number of returned or affected rows, by default None
+        params : optional
+            statement parameters, by default None
+        """
+        if self.slow_query_log is not None:
+            self.slow_query_log.record(self, str(sql_statement), db_name, time.perf_counter() - started, n_rows, params)
+
+    @contextmanager
+    def _enforce_timeout(
+        self,
+        connection,
+        timeout: float = None,
+        sql_statement: str = None):
+        """Enforce timeout of statements run on a connection inside the block.
+        Server-side timeout is used if dialect supports it, otherwise a watchdog thread
+        cancels the running statement
+
+        Parameters
+        ----------
+        connection : Connection
+            connection which runs statements
+        timeout : float, optional
+            timeout in seconds, by default timeout of this object
+        sql_statement : str, optional
+            statement which will be run, by default None
+
+        Raises
+        ------
+        QueryTimeoutError
+            statement runs longer than timeout
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        if not timeout:
+            yield
+            return
+
+        statement = self.get_timeout_statement(timeout, str(sql_statement) if sql_statement is not None else None)
+        cancelled = threading.Event()
+        watchdog = None
+
+        if statement is not None:
+            connection.execute(sqlalchemy.text(statement))
+        else:
+            fairy = connection.connection
+            dbapi_connection = getattr(fairy, "dbapi_connection", None) or fairy.connection
+
+            def cancel():
+                cancelled.set()
+                try:
+                    self.cancel_connection(dbapi_connection)
+                except Exception as e:
+                    print("Cannot cancel query:", e)
+
+            watchdog = threading.Timer(timeout, cancel)
+            watchdog.daemon = True
+            watchdog.start()
+
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if cancelled.is_set() or time.perf_counter() - started >= timeout:
+                raise QueryTimeoutError("Query exceeded timeout of {} seconds".format(timeout)) from e
+            raise
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            if statement is not None:
+                # Connection goes back to pool, reset its timeout
+                try:
+                    connection.execute(sqlalchemy.text(self.get_timeout_statement(0, sql_statement)))
+                except Exception:
+                    pass
+
+    def explain(
+        self,
+        sql_statement: str,
+        db_name: str = None,
+        **kwargs) -> pd.DataFrame:
+        """Get query plan of a SELECT statement. Sub-class can override this
+        if the dialect does not support EXPLAIN
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        db_name : str, optional
+            database name, by default None
+        **kwargs: see pandas.read_sql() doc
+
+        Returns
+        -------
+        pd.DataFrame
+            query plan
+        """
+        # Create Connection
+        engine, connection = self.create_connection(db_name)
+
+        try:
+            result = pd.read_sql(sql='EXPLAIN ' + sql_statement, con=connection, **kwargs)
+        finally:
+            # Close connection
+            connection.close()
+
+        return result
+
+    def _load_table_within_budget(
+        self,
+        db_name: str,
+        table_name: str,
+        sql: str,
+        memory_budget: int,
+        spill_dir: str = None,
+        **kwargs):
+        """Spill a table to Parquet file if its estimated size exceeds memory budget
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        sql : str
+            table name or SELECT statement passed to pandas.read_sql()
+        memory_budget : int
+            memory budget in bytes
+        spill_dir : str, optional
+            directory of spilled file, by default system temp directory
+
+        Returns
+        -------
+        SpilledTable or None
+            handle of spilled table or None if the table fits in memory budget
+        """
+        try:
+            n_rows, n_bytes = self.estimate_table_size(db_name, table_name)
+        except Exception as e:
+            print("Cannot estimate size of", table_name, ":", e)
+            return None
+
+        if n_bytes <= memory_budget:
+            return None
+
+        print(table_name, "is estimated at", n_bytes, "bytes which exceeds memory budget, spilling to disk")
+
+        # Keep each chunk at about a quarter of the budget
+        row_width = max(1, n_bytes // max(1, n_rows))
+        chunksize = max(1000, memory_budget // 4 // row_width)
+
+        # Column types of the file come from the table, not from its first chunk
+        schema, _, name = table_name.rpartition('.')
+        columns = self.get_table_schema(db_name, name, schema or None)
+
+        fd, file_path = tempfile.mkstemp(prefix="%s_" % table_name, suffix=".parquet", dir=spill_dir)
+        os.close(fd)
+
+        # Create Connection
+        engine, connection = self.create_connection(db_name)
+
+        try:
+            kwargs.pop("sql", None)
+            kwargs.pop("con", None)
+            kwargs.pop("coerce_float", None)
+            kwargs.pop("chunksize", None)
+            stream = connection.execution_options(stream_results=True)
+            chunks = pd.read_sql(sql=sql, con=stream, coerce_float=True, chunksize=chunksize, **kwargs)
+            n_rows, schema = write_parquet(chunks, file_path, columns=columns)
+        except Exception:
+            os.remove(file_path)
+            raise
+        finally:
+            # Close connection
+            connection.close()
+
+        return SpilledTable(file_path, n_rows, schema.names if schema is not None else [])
+
+    @deduplicate
+    @read_only
     def load_table(
         self, 
         db_name: str, 
         table_name: str, 
+        memory_budget: int = None,
+        spill_dir: str = None,
+        timeout: float = None,
         **kwargs) -> pd.DataFrame:
         """Load a table from database
 
@@ -201,31 +716,49 @@ class BaseDB:
             database name
         table_name : str
             table name
+        memory_budget : int, optional
+            memory budget in bytes. If the estimated size of table exceeds it, the table is read
+            in chunks into a Parquet file and SpilledTable is returned instead, by default None
+        spill_dir : str, optional
+            directory of spilled file, by default system temp directory
+        timeout : float, optional
+            timeout in seconds, by default timeout of this object
 
         Returns
         -------
-        pd.DataFrame
+        pd.DataFrame or SpilledTable
             loaded table
         """
+        if memory_budget is not None:
+            sql = 'SELECT * FROM %s' % table_name
+            spilled = self._load_table_within_budget(db_name, table_name, sql, memory_budget, spill_dir, **kwargs)
+            if spilled is not None:
+                return spilled
+
         # Create Connection
         engine, connection = self.create_connection(db_name)
-
-        # Check if table exists and read
-        if engine.dialect.has_table(engine, table_name):
-            # Prevent duplicate keys
-            kwargs.pop("sql", None)
-            kwargs.pop("con", None)
-            kwargs.pop("coerce_float", None)
-            result = pd.read_sql(sql=table_name, con=connection, coerce_float=True, **kwargs)
-        else:
-            print(table_name, "does not exist")
-            result = None
-
-        # Close connection
-        connection.close()
+        started = time.perf_counter()
+
+        try:
+            # Check if table exists and read
+            if engine.dialect.has_table(engine, table_name):
+                # Prevent duplicate keys
+                kwargs.pop("sql", None)
+                kwargs.pop("con", None)
+                kwargs.pop("coerce_float", None)
+                with self._enforce_timeout(connection, timeout, 'SELECT'):
+                    result = pd.read_sql(sql=table_name, con=connection, coerce_float=True, **kwargs)
+                self._log_query('SELECT * FROM %s' % table_name, db_name, started, len(result))
+            else:
+                print(table_name, "does not exist")
+                result = None
+        finally:
+            # Close connection
+            connection.close()
 
         return result
 
+    @read_only
     def load_tables(
         self, 
         db_name: str, 
@@ -277,6 +810,10 @@ class BaseDB:
         table_name: str, 
         index: bool = False, 
         if_exists: str = 'replace', 
+        parallel: bool = False,
+        max_workers: int = None,
+        atomic: bool = True,
+        infer_dtype: bool = True,
         **kwargs):
         """Save pandas dataframe to database
 
@@ -292,25 +829,299 @@ class BaseDB:
             Write DataFrame index as a column, by default False
         if_exists : str, optional
             How to behave if the table already exists ({‘fail’, ‘replace’, ‘append’}), by default 'replace'
-        """
+        parallel : bool, optional
+            write chunks concurrently over pooled connections, only for if_exists='append', by default False
+        max_workers : int, optional
+            number of concurrent writers, by default parallel_write_workers
+        atomic : bool, optional
+            (parallel only) write chunks into a staging table and move all rows to the target table
+            in one transaction, otherwise failed chunks are skipped, by default True
+        infer_dtype : bool, optional
+            create new table with column types mapped from dataframe dtypes by
+            utils.get_sqlalchemy_datatype_from_dtypes() if dtype is not given (strings are TEXT
+            when the table is created by append), by default True
 
-        # Create Connection
-        engine, connection = self.create_connection(db_name)
+        Returns
+        -------
+        int or None
+            number of written rows when appending in parallel mode or to an existing table
+        """
 
         # Prevent duplicate keys
         kwargs.pop("name", None)
         kwargs.pop("con", None)
 
+        schema = kwargs.get("schema")
+
+        # Append to existing table with its cached schema, without reflection by pandas
+        if if_exists == 'append' and not parallel and not index and not kwargs.get("dtype") and not kwargs.get("method"):
+            columns = self.get_table_schema(db_name, table_name, schema)
+            if columns is not None:
+                try:
+                    return self._insert_with_schema(df, db_name, table_name, columns, schema)
+                except (ValueError, sqlalchemy.exc.ProgrammingError):
+                    # Table may have been altered since it was cached, reflect it again and retry once
+                    columns = self.get_table_schema(db_name, table_name, schema, refresh=True)
+                    if columns is not None:
+                        return self._insert_with_schema(df, db_name, table_name, columns, schema)
+
+        if infer_dtype and not kwargs.get("dtype") and len(df) > 0:
+            # A table created by append gets more rows later, its strings are not sized by the first rows
+            kwargs["dtype"] = get_sqlalchemy_datatype_from_dtypes(df, size_strings=if_exists != 'append')
+
+        # Table may be (re)created, reflect it again on next append
+        self.schema_cache.pop((db_name, schema, table_name), None)
+
+        if parallel and if_exists == 'append':
+            return self._save_table_parallel(df, db_name, table_name, index, max_workers, atomic, **kwargs)
+
+        # Create Connection
+        engine, connection = self.create_connection(db_name)
+
         # Write df to database
         df.to_sql(name=table_name, con=engine, index=index, if_exists=if_exists, **kwargs)
 
         # Close connection
         connection.close()
 
+    def appender(
+        self,
+        db_name: str,
+        table_name: str,
+        max_rows: int = 10000,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_latency: float = 1.0,
+        max_buffer_rows: int = 100000,
+        retry_interval: float = 1.0,
+        **kwargs) -> Appender:
+        """Create thread-safe write-behind appender of a table for many small appends
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        max_rows : int, optional
+            flush when this many rows are buffered, by default 10000
+        max_bytes : int, optional
+            flush when buffered dataframes use this many bytes, by default 16 MB
+        max_latency : float, optional
+            flush when the oldest buffered row waits this long (seconds), by default 1.0
+        max_buffer_rows : int, optional
+            block producers when this many rows are buffered, by default 100000
+        retry_interval : float, optional
+            seconds to wait before rows of a failed write are written again, by default 1.0
+        **kwargs: see save_table()
+
+        Returns
+        -------
+        Appender
+            appender, call append(df) from producers and close() at the end
+        """
+        return Appender(self, db_name, table_name, max_rows=max_rows, max_bytes=max_bytes, max_latency=max_latency,
+                        max_buffer_rows=max_buffer_rows, retry_interval=retry_interval, **kwargs)
+
+    def get_table_schema(
+        self,
+        db_name: str,
+        table_name: str,
+        schema: str = None,
+        refresh: bool = False) -> list:
+        """Get columns of a table, reflected once and cached
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        schema : str, optional
+            schema name, by default None
+        refresh : bool, optional
+            reflect the table again, by default False
+
+        Returns
+        -------
+        list or None
+            list of (column name, SQLAlchemy type) or None if the table does not exist
+        """
+        key = (db_name, schema, table_name)
+        if not refresh and key in self.schema_cache:
+            return self.schema_cache[key]
+
+        # Forget the table if it does not exist anymore
+        self.schema_cache.pop(key, None)
+
+        # Create Connection
+        engine, connection = self.create_connection(db_name)
+
+        try:
+            inspector = sqlalchemy.inspect(connection)
+            if table_name not in inspector.get_table_names(schema=schema):
+                return None
+            columns = [(col['name'], col['type']) for col in inspector.get_columns(table_name, schema=schema)]
+        finally:
+            # Close connection
+            connection.close()
+
+        self.schema_cache[key] = columns
+        return columns
+
+    def clear_schema_cache(self, sql_statement: str = None):
+        """Drop cached table schemas of get_table_schema(), call it after tables are altered
+        outside this object
+
+        Parameters
+        ----------
+        sql_statement : str, optional
+            executed SQL statement, the cache is dropped only if it may change schema (DDL), by default None (always)
+        """
+        if sql_statement is None or \
+                str(sql_statement).lstrip().upper().startswith(('ALTER', 'DROP', 'CREATE', 'RENAME', 'TRUNCATE')):
+            self.schema_cache.clear()
+
+    def _insert_with_schema(
+        self,
+        df: pd.DataFrame,
+        db_name: str,
+        table_name: str,
+        columns: list,
+        schema: str = None) -> int:
+        """Insert dataframe into an existing table by executemany, columns are coerced
+        to the table types before anything is written
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            dataframe to be save
+        db_name : str
+            database name
+        table_name : str
+            table name
+        columns : list
+            list of (column name, SQLAlchemy type) from get_table_schema()
+        schema : str, optional
+            schema name, by default None
+
+        Returns
+        -------
+        int
+            number of written rows
+        """
+        if len(df) == 0:
+            return 0
+
+        df = convert_df_to_sqlalchemy_datatype(df, dict(columns))
+        records = df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+        table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
+                                 *[sqlalchemy.Column(name, column_type) for name, column_type in columns],
+                                 schema=schema)
+
+        # Create Connection
+        engine, connection = self.create_connection(db_name)
+
+        try:
+            with connection.begin():
+                connection.execute(table.insert(), records)
+        finally:
+            # Close connection
+            connection.close()
+
+        return len(records)
+
+    def _save_table_parallel(
+        self,
+        df: pd.DataFrame,
+        db_name: str,
+        table_name: str,
+        index: bool,
+        max_workers: int = None,
+        atomic: bool = True,
+        **kwargs) -> int:
+        """Append dataframe to a table by writing its chunks concurrently
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            dataframe to be save
+        db_name : str
+            database name
+        table_name : str
+            table name
+        index : bool
+            Write DataFrame index as a column
+        max_workers : int, optional
+            number of concurrent writers, by default parallel_write_workers
+        atomic : bool, optional
+            all-or-nothing (staging table) or best-effort, by default True
+
+        Returns
+        -------
+        int
+            number of written rows
+        """
+        max_workers = max_workers or self.parallel_write_workers
+        chunksize = kwargs.pop("chunksize", None) or self.parallel_write_chunksize
+        schema = kwargs.get("schema")
+
+        # All writers share the connection pool of one engine
+        engine, connection = self.create_connection(db_name)
+        connection.close()
+
+        # Create the target table once (no-op if it exists)
+        df.head(0).to_sql(name=table_name, con=engine, index=index, if_exists='append', **kwargs)
+
+        target = table_name
+        if atomic:
+            target = "%s_staging_%s" % (table_name, uuid.uuid4().hex[:8])
+            df.head(0).to_sql(name=target, con=engine, index=index, if_exists='fail', **kwargs)
+
+        def write(chunk):
+            with engine.begin() as conn:
+                chunk.to_sql(name=target, con=conn, index=index, if_exists='append', **kwargs)
+            return len(chunk)
+
+        # Write chunks concurrently
+        n_rows = 0
+        errors = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(write, df.iloc[i:i + chunksize]): i for i in range(0, len(df), chunksize)}
+            for future in as_completed(futures):
+                try:
+                    n_rows += future.result()
+                except Exception as e:
+                    print("Failed to write rows", futures[future], "to", futures[future] + chunksize, ":", e)
+                    errors.append(e)
+
+        if not atomic:
+            return n_rows
+
+        # Move rows from staging table to target table in one transaction
+        preparer = engine.dialect.identifier_preparer
+        prefix = preparer.quote_schema(schema) + "." if schema else ""
+        try:
+            if errors:
+                raise errors[0]
+            columns = [col["name"] for col in sqlalchemy.inspect(engine).get_columns(target, schema=schema)]
+            column_sql = ", ".join(preparer.quote(col) for col in columns)
+            with engine.begin() as conn:
+                conn.execute(sqlalchemy.text("INSERT INTO %s%s (%s) SELECT %s FROM %s%s" % (
+                    prefix, preparer.quote(table_name), column_sql, column_sql, prefix, preparer.quote(target))))
+        finally:
+            with engine.begin() as conn:
+                conn.execute(sqlalchemy.text("DROP TABLE %s%s" % (prefix, preparer.quote(target))))
+
+        return n_rows
+
+    @deduplicate
+    @read_only
     def query(
         self, 
         sql_statement: str, 
         db_name: str = None,
+        timeout: float = None,
         **kwargs) -> pd.DataFrame:
         """Run SQL query
 
@@ -320,6 +1131,8 @@ class BaseDB:
             SQL statement
         db_name : str, optional
             database name, by default None
+        timeout : float, optional
+            timeout in seconds, by default timeout of this object
         **kwargs: see pandas.read_sql() doc
 
         Returns
@@ -336,14 +1149,174 @@ class BaseDB:
         kwargs.pop("con", None)
         kwargs.pop("coerce_float", None)
 
-        result = pd.read_sql(sql=sql_statement, con=connection, coerce_float=True, **kwargs)
+        started = time.perf_counter()
+        try:
+            with self._enforce_timeout(connection, timeout, sql_statement):
+                result = pd.read_sql(sql=sql_statement, con=connection, coerce_float=True, **kwargs)
+        finally:
+            # Close connection
+            connection.close()
 
-        # Close connection
-        connection.close()
+        self._log_query(sql_statement, db_name, started, len(result), kwargs.get("params"))
 
         return result
 
 
+    def query_all(
+        self,
+        sql_statement: str,
+        db_names: list = None,
+        max_workers: int = 8,
+        stream: bool = False,
+        tag_column: str = 'db_name',
+        **kwargs):
+        """Run SQL query on many databases of this host concurrently
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        db_names : list, optional
+            database names, by default all databases from get_databases()
+        max_workers : int, optional
+            number of concurrent queries, by default 8
+        stream : bool, optional
+            yield (db_name, pd.DataFrame or None, exception or None) as each database completes
+            instead of concatenating, by default False
+        tag_column : str, optional
+            column added to results with the source database name, by default 'db_name'
+        **kwargs: see query()
+
+        Returns
+        -------
+        tuple or generator
+            concatenated pd.DataFrame and dict of failed database name and exception,
+            or generator if stream is True
+        """
+        if db_names is None:
+            db_names = self.get_databases()
+
+        results = iter_query_all([(self, db_name) for db_name in db_names], sql_statement,
+                                 max_workers=max_workers, tag_column=tag_column, **kwargs)
+        if stream:
+            return ((db_name, df, error) for _, db_name, df, error in results)
+
+        dfs = []
+        errors = {}
+        for _, db_name, df, error in results:
+            if error is not None:
+                print("Query on", db_name, "failed:", error)
+                errors[db_name] = error
+            else:
+                dfs.append(df)
+
+        return (pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()), errors
+
+    def load_sample(
+        self,
+        db_name: str,
+        table_name: str,
+        n: int = None,
+        fraction: float = None,
+        method: str = 'system',
+        **kwargs) -> pd.DataFrame:
+        """Load a random sample of a table, sampling is done on server side without sorting the table.
+        The result can be passed to utils.get_datatype_each_col() to detect column types of a huge table
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        n : int, optional
+            number of rows (at most n rows are returned, if fewer rows are sampled, the table is sampled
+            again with a higher fraction, by row for a small table), by default None
+        fraction : float, optional
+            fraction of rows (0 - 1], by default None
+        method : str, optional
+            'system' (fast, samples pages or key ranges) or 'bernoulli' (uniform, reads each row), by default 'system'
+        **kwargs: see query()
+
+        Returns
+        -------
+        pd.DataFrame
+            sampled rows
+        """
+        if (n is None) == (fraction is None):
+            raise ValueError("either n or fraction must be given")
+        if method not in ('system', 'bernoulli'):
+            raise ValueError("method must be 'system' or 'bernoulli'")
+
+        n_rows = None
+        if n is not None:
+            n_rows = self.estimate_row_count(db_name, table_name)
+            # Over-sample a little, page sampling returns a varying number of rows
+            fraction = min(1.0, n * 1.2 / n_rows) if n_rows else 1.0
+
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be in (0, 1]")
+
+        sql = self.build_sample_sql(db_name, table_name, fraction, method)
+        result = self.query(sql, db_name, **kwargs)
+
+        # Too few rows were sampled, sample again with a higher fraction. Pages (or vectors) of a small
+        # table are often all skipped, so only a small table is sampled by row, reading each row of
+        # a large table would be much slower than sampling it by the method of caller
+        retries = 3
+        while n is not None and len(result) < n and fraction < 1 and retries > 0:
+            # Scale by the missing rows, nothing sampled means whole pages were skipped
+            fraction = min(1.0, fraction * (n * 1.2 / len(result) if len(result) > 0 else 10))
+            retry_method = 'bernoulli' if n_rows is not None and n_rows <= 100000 else method
+            sql = self.build_sample_sql(db_name, table_name, fraction, retry_method)
+            result = self.query(sql, db_name, **kwargs)
+            retries -= 1
+
+        if n is not None and len(result) > n:
+            result = result.sample(n=n).reset_index(drop=True)
+
+        return result
+
+    def paginate(
+        self,
+        db_name: str,
+        table_name: str,
+        key_columns: list,
+        page_size: int = 1000,
+        where: str = None,
+        params: dict = None,
+        cursor: str = None,
+        columns: list = None) -> KeysetPaginator:
+        """Page through a table ordered by key columns with keyset (seek) pagination
+
+        Parameters
+        ----------
+        db_name : str
+            database name
+        table_name : str
+            table name
+        key_columns : list
+            columns which uniquely identify a row, in sort order
+        page_size : int, optional
+            number of rows per page, by default 1000
+        where : str, optional
+            extra filter, with :name placeholders, by default None
+        params : dict, optional
+            parameters of where, by default None
+        cursor : str, optional
+            cursor token (paginator.cursor) to resume after a page, by default None
+        columns : list, optional
+            columns to select, by default all columns
+
+        Returns
+        -------
+        KeysetPaginator
+            iterator of pages (pd.DataFrame), its cursor attribute is the resume token
+        """
+        return KeysetPaginator(self, db_name, table_name, key_columns, page_size=page_size, where=where,
+                               params=params, cursor=cursor, columns=columns)
+
+    @read_only
     def get_count(
         self, 
         db_name: str, 
@@ -366,7 +1339,8 @@ class BaseDB:
         engine, connection = self.create_connection(db_name)
 
         # Check if table exists
-        if engine.dialect.has_table(engine, table_name):
+        schema, _, name = table_name.rpartition('.')
+        if engine.dialect.has_table(engine, name, schema=schema or None):
             sql = 'select count(*) from %s;' % table_name
             result = pd.read_sql(sql, connection, coerce_float=True).iloc[:, 0].values[0]
         else:
@@ -382,6 +1356,7 @@ class BaseDB:
         self, 
         sql_statement: str,
         db_name: str = None,
+        timeout: float = None,
         **kwargs):
         """Execute SQL Statement to database
 
@@ -391,6 +1366,8 @@ class BaseDB:
             SQL statement
         db_name : str, optional
             database name, by default None
+        timeout : float, optional
+            timeout in seconds, by default timeout of this object
 
         Returns
         -------
@@ -402,10 +1379,17 @@ class BaseDB:
         engine, connection = self.create_connection(db_name)
 
         # Execute SQL
-        result = connection.execute(sql_statement, **kwargs)
-
-        # Close connection
-        connection.close()
+        started = time.perf_counter()
+        try:
+            with self._enforce_timeout(connection, timeout, sql_statement):
+                result = connection.execute(sql_statement, **kwargs)
+            self._log_query(sql_statement, db_name, started, result.rowcount)
+        finally:
+            # Close connection
+            connection.close()
+
+        # Schema of tables may be changed
+        self.clear_schema_cache(sql_statement)
 
         # return metadata of query execution result
         return result
@@ -449,6 +1433,9 @@ class BaseDB:
         # Close connection
         cursor.close()
         connection.commit()
+
+        # Procedure may change schema of tables
+        self.clear_schema_cache()
         connection.close()
         
         # return result
@@ -458,6 +1445,179 @@ class BaseDB:
             return affected_rows
 
 
+    def call_procedure_stream(
+        self,
+        sql_statement: str,
+        db_name: str = None,
+        chunksize: int = 10000,
+        **kwargs):
+        """Execute SQL Stored Procedure Statement and stream its results in chunks.
+        Rows are fetched with cursor.fetchmany() of get_streaming_cursor(), and all result sets are read
+        by cursor.nextset(). Column types are taken from the first chunk of each result set, so every
+        chunk of a result set has the same dtypes (integer columns are nullable Int64)
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        db_name : str, optional
+            database name, by default None
+        chunksize : int, optional
+            number of rows per chunk, by default 10000
+
+        Yields
+        ------
+        pd.DataFrame
+            chunk of a result set, the index of result set is in df.attrs['result_set']
+        """
+
+        # Create Connection
+        engine, connection = self.create_connection(db_name, raw=True)
+        dbapi = engine.dialect.dbapi
+
+        try:
+            # Execute Procedure
+            cursor = self.get_streaming_cursor(connection)
+            cursor.execute(sql_statement, **kwargs)
+
+            result_set = 0
+            while True:
+                # Statements without result set (e.g. UPDATE in procedure) have no description
+                if cursor.description is not None:
+                    column_names = [col[0] for col in cursor.description]
+                    dtypes = None
+                    while True:
+                        rows = cursor.fetchmany(chunksize)
+                        if not rows:
+                            break
+                        df = _get_typed_dataframe(rows, column_names, cursor.description, dbapi)
+                        if dtypes is None:
+                            # Integers may be NULL in a later chunk, keep them nullable from the first chunk
+                            dtypes = ['Int64' if dtype.kind in 'iu' else dtype for dtype in df.dtypes]
+                        df = _conform_dtypes(df, dtypes)
+                        df.attrs['result_set'] = result_set
+                        yield df
+                    result_set += 1
+
+                # Move to next result set (not supported by some drivers, e.g. psycopg2)
+                try:
+                    if not hasattr(cursor, "nextset") or not cursor.nextset():
+                        break
+                except dbapi.NotSupportedError:
+                    break
+
+            cursor.close()
+            connection.commit()
+        finally:
+            connection.close()
+
+
+def _estimate_column_width(column_type) -> int:
+    """Estimate in-memory bytes per value of a column in pandas dataframe
+
+    Parameters
+    ----------
+    column_type : TypeEngine
+        SQLAlchemy type of column
+
+    Returns
+    -------
+    int
+        bytes per value
+    """
+    affinity = getattr(column_type, '_type_affinity', None)
+    fixed_width_types = (sqlalchemy.types.Integer, sqlalchemy.types.Numeric, sqlalchemy.types.Boolean,
+                         sqlalchemy.types.DateTime, sqlalchemy.types.Date, sqlalchemy.types.Time)
+
+    if affinity is not None and issubclass(affinity, fixed_width_types):
+        return 8
+
+    # Python object: pointer and str/bytes header plus content
+    length = getattr(column_type, 'length', None)
+    return 8 + 49 + (length if length else 256)
+
+
+def _get_typed_dataframe(
+    rows: list,
+    column_names: list,
+    description: tuple,
+    dbapi) -> pd.DataFrame:
+    """Create dataframe from fetched rows with column types taken from cursor.description
+
+    Parameters
+    ----------
+    rows : list
+        fetched rows
+    column_names : list
+        column names
+    description : tuple
+        cursor.description (PEP 249)
+    dbapi : module
+        DBAPI module of the driver, its type objects (NUMBER, DATETIME) are compared with type_code
+
+    Returns
+    -------
+    pd.DataFrame
+        typed dataframe
+    """
+    df = pd.DataFrame.from_records(list(rows), columns=column_names, coerce_float=True)
+
+    columns = []
+    for i, col in enumerate(description):
+        type_code = col[1]
+        series = df.iloc[:, i]
+        try:
+            if type_code == getattr(dbapi, "DATETIME", None):
+                series = pd.to_datetime(series)
+            elif type_code == getattr(dbapi, "NUMBER", None):
+                series = pd.to_numeric(series)
+        except (ValueError, TypeError):
+            # Leave the column as it is
+            pass
+        columns.append(series)
+
+    df = pd.concat(columns, axis=1)
+    df.columns = column_names
+
+    return df.infer_objects()
+
+
+def _conform_dtypes(
+    df: pd.DataFrame,
+    dtypes: list) -> pd.DataFrame:
+    """Convert columns of dataframe to given dtypes by position, columns which cannot be
+    converted are left as they are
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        dataframe
+    dtypes : list
+        dtype of each column
+
+    Returns
+    -------
+    pd.DataFrame
+        converted dataframe
+    """
+    columns = []
+    for i, dtype in enumerate(dtypes):
+        series = df.iloc[:, i]
+        if series.dtype != dtype:
+            try:
+                series = series.astype(dtype)
+            except (ValueError, TypeError):
+                # Leave the column as it is
+                pass
+        columns.append(series)
+
+    result = pd.concat(columns, axis=1)
+    result.columns = df.columns
+    result.attrs = df.attrs
+
+    return result
+
+
 def print_help():
     """
     print help
@@ -0,0 +1,100 @@
+"""
+    Coraline DB Fan-out - Run a query across many databases concurrently
+"""
+
+# import python packages
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def iter_query_all(
+    targets: list,
+    sql_statement: str,
+    max_workers: int = 8,
+    tag_column: str = 'db_name',
+    host_column: str = None,
+    **kwargs):
+    """Run the same query on many databases concurrently and yield results as they complete
+
+    Parameters
+    ----------
+    targets : list
+        list of (database object, database name)
+    sql_statement : str
+        SQL statement
+    max_workers : int, optional
+        number of concurrent queries, by default 8
+    tag_column : str, optional
+        column added to each result with its database name, by default 'db_name'
+    host_column : str, optional
+        column added to each result with its host, by default None (not added)
+    **kwargs: see BaseDB.query()
+
+    Yields
+    ------
+    tuple
+        (database object, database name, pd.DataFrame or None, exception or None)
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(db.query, sql_statement, db_name, **kwargs): (db, db_name)
+                   for db, db_name in targets}
+
+        for future in as_completed(futures):
+            db, db_name = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                yield db, db_name, None, e
+                continue
+
+            df.insert(0, tag_column, db_name, allow_duplicates=True)
+            if host_column is not None:
+                df.insert(0, host_column, db.host, allow_duplicates=True)
+            yield db, db_name, df, None
+
+
+def query_all(
+    targets: list,
+    sql_statement: str,
+    max_workers: int = 8,
+    tag_column: str = 'db_name',
+    host_column: str = 'host',
+    **kwargs) -> tuple:
+    """Run the same query on databases of many database objects and concatenate the results
+
+    Parameters
+    ----------
+    targets : list
+        list of database objects (all of their databases) or (database object, database name)
+    sql_statement : str
+        SQL statement
+    max_workers : int, optional
+        number of concurrent queries, by default 8
+    tag_column : str, optional
+        column with database name of each row, by default 'db_name'
+    host_column : str, optional
+        column with host of each row, by default 'host'
+    **kwargs: see BaseDB.query()
+
+    Returns
+    -------
+    tuple
+        concatenated pd.DataFrame and dict of failed (host, database name) and exception
+    """
+    pairs = []
+    for target in targets:
+        if isinstance(target, (tuple, list)):
+            pairs.append(tuple(target))
+        else:
+            pairs.extend((target, db_name) for db_name in target.get_databases())
+
+    dfs = []
+    errors = {}
+    for db, db_name, df, error in iter_query_all(pairs, sql_statement, max_workers, tag_column, host_column, **kwargs):
+        if error is not None:
+            print("Query on", db.host, db_name, "failed:", error)
+            errors[(db.host, db_name)] = error
+        else:
+            dfs.append(df)
+
+    return (pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()), errors
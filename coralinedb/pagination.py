@@ -0,0 +1,141 @@
+"""
+    Coraline DB Pagination - Page through ordered tables by keyset (seek) pagination
+"""
+
+# import python packages
+import json
+import base64
+from datetime import date, datetime
+from sqlalchemy import text
+
+
+def encode_cursor(values: list) -> str:
+    """
+    encode key values of the last row into a cursor token
+    :param values: key values (list)
+    :return: url-safe cursor token (str)
+    """
+    values = [v.item() if hasattr(v, 'item') else v for v in values]
+    values = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode('utf8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    decode a cursor token into key values
+    :param cursor: cursor token (str)
+    :return: key values (list)
+    """
+    return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf8'))
+
+
+class KeysetPaginator:
+    """
+    Iterator of pages of a table ordered by key columns.
+    Each page is read by "WHERE (key) > (last key) ORDER BY key" with a limit, so every page
+    costs the same as the first one (with an index on key columns).
+    After (or during) iteration, cursor holds the token to resume after the last returned page.
+    """
+
+    def __init__(
+        self,
+        db,
+        db_name: str,
+        table_name: str,
+        key_columns: list,
+        page_size: int = 1000,
+        where: str = None,
+        params: dict = None,
+        cursor: str = None,
+        columns: list = None):
+        """Initial paginator
+
+        Parameters
+        ----------
+        db : BaseDB
+            database object
+        db_name : str
+            database name
+        table_name : str
+            table name
+        key_columns : list
+            columns which uniquely identify a row, in sort order
+        page_size : int, optional
+            number of rows per page, by default 1000
+        where : str, optional
+            extra filter, with :name placeholders, by default None
+        params : dict, optional
+            parameters of where, by default None
+        cursor : str, optional
+            cursor token to resume from, by default None (first page)
+        columns : list, optional
+            columns to select, by default all columns (key columns are selected too, to build the
+            cursor, and left out of pages if they are not in columns)
+        """
+        if isinstance(key_columns, str):
+            key_columns = [key_columns]
+
+        self.db = db
+        self.db_name = db_name
+        self.table_name = table_name
+        self.key_columns = list(key_columns)
+        self.page_size = page_size
+        self.where = where
+        self.params = dict(params) if params else {}
+        self.cursor = cursor
+        self.columns = list(columns) if columns else None
+
+        # Key columns are needed to build the cursor even if caller does not select them
+        self.hidden_columns = []
+        if self.columns:
+            self.hidden_columns = [c for c in self.key_columns if c not in self.columns]
+            self.columns += self.hidden_columns
+
+    def build_sql(self) -> tuple:
+        """Build SQL statement of the next page
+
+        Returns
+        -------
+        tuple
+            SQL statement (str) and its parameters (dict)
+        """
+        params = dict(self.params)
+        conditions = []
+
+        if self.where:
+            conditions.append('(%s)' % self.where)
+
+        if self.cursor is not None:
+            values = decode_cursor(self.cursor)
+
+            # (k0, k1) > (v0, v1) expanded as k0 > v0 OR (k0 = v0 AND k1 > v1), row values are not supported by MSSQL
+            alternatives = []
+            for i, column in enumerate(self.key_columns):
+                terms = ['%s = :_key%d' % (self.key_columns[j], j) for j in range(i)]
+                terms.append('%s > :_key%d' % (column, i))
+                alternatives.append('(%s)' % ' AND '.join(terms))
+            conditions.append('(%s)' % ' OR '.join(alternatives))
+            params.update({'_key%d' % i: value for i, value in enumerate(values)})
+
+        sql = 'SELECT %s FROM %s' % (', '.join(self.columns) if self.columns else '*', self.table_name)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY ' + ', '.join(self.key_columns)
+
+        return self.db.build_limit_sql(sql, self.page_size), params
+
+    def __iter__(self):
+        while True:
+            sql, params = self.build_sql()
+            page = self.db.query(text(sql), self.db_name, params=params)
+
+            if len(page) == 0:
+                return
+
+            self.cursor = encode_cursor(page[self.key_columns].iloc[-1].tolist())
+            if self.hidden_columns:
+                page = page.drop(columns=self.hidden_columns)
+            yield page
+
+            if len(page) < self.page_size:
+                return
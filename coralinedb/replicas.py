@@ -0,0 +1,182 @@
+"""
+    Coraline DB Replicas - Route read calls to read replicas
+"""
+
+# import python packages
+import copy
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+
+
+class ReplicaSet:
+    """
+    Set of read replicas of a primary database object.
+    Replicas are health-checked by a background thread every health_check_interval, so reads never
+    wait for a check. Unhealthy or lagging replicas (and replicas before their first check) are
+    skipped until they pass a later check.
+    """
+
+    def __init__(
+        self,
+        primary,
+        replicas: list,
+        routing: str = 'round_robin',
+        max_replica_lag: float = None,
+        health_check_interval: float = 30):
+        """Initial replica set
+
+        Parameters
+        ----------
+        primary : BaseDB
+            primary database object, replicas are copied from it with another host
+        replicas : list
+            list of replica hosts, each item is host (str) or (host, port) tuple
+        routing : str, optional
+            'round_robin' or 'least_outstanding', by default 'round_robin'
+        max_replica_lag : float, optional
+            maximum replication lag in seconds, by default None (not checked)
+        health_check_interval : float, optional
+            seconds between health checks of a replica, by default 30
+        """
+        if routing not in ('round_robin', 'least_outstanding'):
+            raise ValueError("routing must be 'round_robin' or 'least_outstanding'")
+
+        self.routing = routing
+        self.max_replica_lag = max_replica_lag
+        self.health_check_interval = health_check_interval
+
+        self.members = []
+        for replica in replicas:
+            host, port = replica if isinstance(replica, (tuple, list)) else (replica, primary.port)
+            member = copy.copy(primary)
+            member.host = host
+            member.port = port
+            member.engines = {}
+            member.replica_set = None
+            self.members.append(member)
+
+        self.healthy = [False] * len(self.members)
+        self.checked_at = [None] * len(self.members)
+        self.outstanding = [0] * len(self.members)
+        self.lock = threading.Lock()
+        self.next_index = 0
+
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="coralinedb-replica-health-check", daemon=True)
+        self.thread.start()
+
+    def check(self, index: int) -> bool:
+        """Check if a replica is reachable and its replication lag is acceptable
+
+        Parameters
+        ----------
+        index : int
+            index of replica
+
+        Returns
+        -------
+        bool
+            True if replica is healthy
+        """
+        member = self.members[index]
+        try:
+            engine = member.get_engine(member.get_health_check_db())
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                if self.max_replica_lag is not None:
+                    lag = member.get_replication_lag(connection)
+                    if lag is not None and lag > self.max_replica_lag:
+                        print("Replica", member.host, "lags", lag, "seconds behind primary")
+                        return False
+            return True
+        except Exception as e:
+            print("Replica", member.host, "is unhealthy:", e)
+            return False
+
+    def refresh(self):
+        """
+        Health check all replicas concurrently, so an unreachable replica does not delay the others
+        """
+        def check(index):
+            healthy = self.check(index)
+            with self.lock:
+                self.healthy[index] = healthy
+                self.checked_at[index] = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=len(self.members)) as executor:
+            list(executor.map(check, range(len(self.members))))
+
+    def _run(self):
+        """
+        background thread, health check replicas now and then every health_check_interval until close()
+        """
+        while not self.stopped.is_set():
+            self.refresh()
+            self.stopped.wait(self.health_check_interval)
+
+    def close(self):
+        """
+        Stop background health checks
+        """
+        self.stopped.set()
+
+    def acquire(self):
+        """Pick a healthy replica for a read, health is taken from the last background check
+
+        Returns
+        -------
+        int or None
+            index of picked replica or None if there is no healthy replica
+        """
+        with self.lock:
+            candidates = [i for i, healthy in enumerate(self.healthy) if healthy]
+            if not candidates:
+                return None
+
+            if self.routing == 'least_outstanding':
+                index = min(candidates, key=lambda i: self.outstanding[i])
+            else:
+                index = candidates[self.next_index % len(candidates)]
+                self.next_index += 1
+
+            self.outstanding[index] += 1
+            return index
+
+    def release(self, index: int):
+        """Mark a read on a replica as finished
+
+        Parameters
+        ----------
+        index : int
+            index of replica
+        """
+        with self.lock:
+            self.outstanding[index] -= 1
+
+
+def read_only(method):
+    """
+    decorator for read methods of BaseDB, route the call to a replica if the object has
+    replicas (falls back to primary when no replica is healthy)
+    :param method: method of BaseDB
+    :return: wrapped method
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        replica_set = getattr(self, "replica_set", None)
+        if replica_set is None:
+            return method(self, *args, **kwargs)
+
+        index = replica_set.acquire()
+        if index is None:
+            return method(self, *args, **kwargs)
+
+        try:
+            return method(replica_set.members[index], *args, **kwargs)
+        finally:
+            replica_set.release(index)
+
+    return wrapper
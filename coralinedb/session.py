@@ -0,0 +1,254 @@
+"""
+    Coraline DB Session - Reuse one connection for multiple calls
+"""
+
+# import python packages
+import pandas as pd
+from contextlib import contextmanager
+
+
+class Session:
+    """
+    Session holds one connection to a database, so every call made on it shares
+    the same connection (and transaction, temp tables, session variables, ...)
+
+    Use it through BaseDB.session()
+        with db.session("database_name", transaction=True) as s:
+            s.execute("CREATE TEMPORARY TABLE ...")
+            df = s.query("SELECT ...")
+    """
+
+    def __init__(
+        self,
+        db,
+        db_name: str = None,
+        transaction: bool = False):
+        """Initial session by opening a connection to database
+
+        Parameters
+        ----------
+        db : BaseDB
+            database object which creates the connection
+        db_name : str, optional
+            database name, by default None
+        transaction : bool, optional
+            run all calls in one transaction, by default False
+        """
+        self.db = db
+        self.db_name = db_name
+        self.engine, self.connection = db.create_connection(db_name)
+        self.transaction = self.connection.begin() if transaction else None
+
+    def close(self):
+        """
+        Close connection of this session. Uncommitted transaction will be rolled back
+        """
+        if self.transaction is not None and self.transaction.is_active:
+            self.transaction.rollback()
+        self.transaction = None
+        self.connection.close()
+
+    def commit(self):
+        """
+        Commit current transaction (if any)
+        """
+        if self.transaction is not None and self.transaction.is_active:
+            self.transaction.commit()
+
+    def rollback(self):
+        """
+        Rollback current transaction (if any)
+        """
+        if self.transaction is not None and self.transaction.is_active:
+            self.transaction.rollback()
+
+    @contextmanager
+    def savepoint(self):
+        """Create a savepoint inside current transaction. Changes made in the block
+        will be rolled back to the savepoint if an exception is raised
+
+        Raises
+        ------
+        RuntimeError
+            session was not created with transaction=True
+        """
+        if self.transaction is None:
+            raise RuntimeError("savepoint requires a session with transaction=True")
+
+        nested = self.connection.begin_nested()
+        try:
+            yield nested
+        except Exception:
+            if nested.is_active:
+                nested.rollback()
+            raise
+        else:
+            if nested.is_active:
+                nested.commit()
+
+    def load_table(
+        self,
+        table_name: str,
+        **kwargs) -> pd.DataFrame:
+        """Load a table from database
+
+        Parameters
+        ----------
+        table_name : str
+            table name
+
+        Returns
+        -------
+        pd.DataFrame
+            loaded table
+        """
+        # Check if table exists and read
+        if self.engine.dialect.has_table(self.connection, table_name):
+            # Prevent duplicate keys
+            kwargs.pop("sql", None)
+            kwargs.pop("con", None)
+            kwargs.pop("coerce_float", None)
+            return pd.read_sql(sql=table_name, con=self.connection, coerce_float=True, **kwargs)
+
+        print(table_name, "does not exist")
+        return None
+
+    def load_tables(
+        self,
+        table_names: list,
+        **kwargs) -> list:
+        """Load multiple tables from database
+
+        Parameters
+        ----------
+        table_names : list
+            list of table names
+
+        Returns
+        -------
+        list
+            list of loaded table
+        """
+        return [self.load_table(tbn, **kwargs) for tbn in table_names]
+
+    def save_table(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        index: bool = False,
+        if_exists: str = 'replace',
+        **kwargs):
+        """Save pandas dataframe to database
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            dataframe to be save
+        table_name : str
+            table name
+        index : bool, optional
+            Write DataFrame index as a column, by default False
+        if_exists : str, optional
+            How to behave if the table already exists ({‘fail’, ‘replace’, ‘append’}), by default 'replace'
+        """
+        # Prevent duplicate keys
+        kwargs.pop("name", None)
+        kwargs.pop("con", None)
+
+        # Write df on the session connection
+        df.to_sql(name=table_name, con=self.connection, index=index, if_exists=if_exists, **kwargs)
+
+        # Table may be (re)created
+        self.db.clear_schema_cache()
+
+    def query(
+        self,
+        sql_statement: str,
+        **kwargs) -> pd.DataFrame:
+        """Run SQL query
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        **kwargs: see pandas.read_sql() doc
+
+        Returns
+        -------
+        pd.DataFrame
+            data
+        """
+        # Prevent duplicate keys
+        kwargs.pop("sql", None)
+        kwargs.pop("con", None)
+        kwargs.pop("coerce_float", None)
+
+        return pd.read_sql(sql=sql_statement, con=self.connection, coerce_float=True, **kwargs)
+
+    def execute(
+        self,
+        sql_statement: str,
+        **kwargs):
+        """Execute SQL Statement to database
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+
+        Returns
+        -------
+        object
+            metadata of query execution
+        """
+        result = self.connection.execute(sql_statement, **kwargs)
+
+        # Schema of tables may be changed
+        self.db.clear_schema_cache(sql_statement)
+
+        return result
+
+    def call_procedure(
+        self,
+        sql_statement: str,
+        return_df: bool = False,
+        **kwargs):
+        """Execute SQL Stored Procedure Statement to database
+
+        Parameters
+        ----------
+        sql_statement : str
+            SQL statement
+        return_df : bool, optional
+            return dataframe flag, by default False
+
+        Returns
+        -------
+        int or pd.DataFrame
+            Number of affected rows or pandas dataframe if the corresponding table exists.
+        """
+        # Use DBAPI connection underneath the session connection
+        raw_connection = self.connection.connection
+        cursor = raw_connection.cursor()
+        affected_rows = cursor.execute(sql_statement, **kwargs)
+
+        # Get Data
+        data, column_names = None, None
+        if return_df == True:
+            data = list(cursor.fetchall())
+            column_names = [col[0] for col in cursor.description] if cursor.description is not None else None
+
+        cursor.close()
+
+        # Commit only when this session does not manage a transaction
+        if self.transaction is None:
+            raw_connection.commit()
+
+        # Procedure may change schema of tables
+        self.db.clear_schema_cache()
+
+        # return result
+        if return_df == True:
+            return pd.DataFrame(data, columns=column_names) if column_names is not None else None
+        else:
+            return affected_rows
@@ -0,0 +1,110 @@
+"""
+    Coraline DB Single Flight - Run concurrent identical calls only once
+"""
+
+# import python packages
+import functools
+import threading
+
+
+class _Call:
+    """
+    In-flight call shared by a leader and its followers
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Group of in-flight calls. While a call with a key is running, other callers with
+    the same key wait for it and receive its result instead of running it again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn once for all concurrent callers with the same key
+
+        Parameters
+        ----------
+        key : hashable
+            key of the call
+        fn : callable
+            function to be called
+
+        Returns
+        -------
+        tuple
+            result of fn and flag whether the result is shared with other callers
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # No more followers can join after the key is removed
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+        return call.result, call.followers > 0
+
+
+# Group shared by all database objects, so objects of the same host are deduplicated too
+default_group = SingleFlight()
+
+
+def _copy_result(result):
+    """
+    give each caller its own copy of a shared result
+    :param result: result of call
+    :return: independent copy for dataframe, the result itself otherwise
+    """
+    copy = getattr(result, "copy", None)
+    return copy() if callable(copy) else result
+
+
+def deduplicate(method):
+    """
+    decorator for read methods of BaseDB, deduplicate concurrent calls with the same
+    (engine url, method, arguments) when single flight is enabled on the object
+    :param method: method of BaseDB
+    :return: wrapped method
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not getattr(self, "single_flight", False):
+            return method(self, *args, **kwargs)
+
+        try:
+            key = (self.get_engine_url(""), method.__name__, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Unhashable arguments (e.g. dict params), use their representation instead
+            key = (self.get_engine_url(""), method.__name__, repr(args), repr(sorted(kwargs.items())))
+
+        result, shared = default_group.do(key, method, self, *args, **kwargs)
+        return _copy_result(result) if shared else result
+
+    return wrapper
@@ -0,0 +1,206 @@
+"""
+    Coraline DB Slow Query Log - Record slow calls and their EXPLAIN plans
+"""
+
+# import python packages
+import os
+import re
+import json
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Literals in SQL text: quoted strings and standalone numbers.
+# String literals depend on the dialect, backends pick one by BaseDB.string_literal_pattern
+# Standard SQL: '' escapes a quote, optional N prefix of national strings
+STANDARD_STRING_LITERAL = re.compile(r"(?<!\w)[Nn]?'(?:[^']|'')*'")
+# MySQL: single or double quoted (double quotes of ANSI_QUOTES identifiers are redacted too), backslash escapes
+MYSQL_STRING_LITERAL = re.compile(r"'(?:[^'\\]|''|\\.)*'" r'|"(?:[^"\\]|""|\\.)*"', re.DOTALL)
+# PostgreSQL: dollar quoted ($$...$$, $tag$...$tag$), E'' with backslash escapes, standard strings
+POSTGRESQL_STRING_LITERAL = re.compile(
+    r"(\$(?:[A-Za-z_]\w*)?\$).*?\1|(?<!\w)[Ee]'(?:[^'\\]|''|\\.)*'|(?<!\w)'(?:[^']|'')*'", re.DOTALL)
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+
+
+def redact_sql(sql_statement: str, string_literal=STANDARD_STRING_LITERAL) -> str:
+    """
+    replace string and number literals in SQL statement by ?
+    :param sql_statement: SQL statement (str)
+    :param string_literal: compiled pattern of string literals of the dialect (re.Pattern)
+    :return:
+        redacted SQL statement (str)
+    """
+    sql_statement = string_literal.sub("?", sql_statement)
+    return _NUMBER_LITERAL.sub("?", sql_statement)
+
+
+def get_call_site(limit: int = 5) -> list:
+    """
+    summarize call stack outside of coralinedb package
+    :param limit: maximum number of frames (int)
+    :return:
+        list of "file:line in function" (list)
+    """
+    frames = [f for f in traceback.extract_stack() if not os.path.abspath(f.filename).startswith(_PACKAGE_DIR)]
+    return ["%s:%d in %s" % (f.filename, f.lineno, f.name) for f in frames[-limit:]]
+
+
+class SlowQueryLog:
+    """
+    Recorder of calls slower than threshold.
+    EXPLAIN plans of slow SELECT statements are captured by a background thread,
+    so the calling thread only pays for appending a record.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        explain: bool = True,
+        max_records: int = 1000,
+        stack_limit: int = 5):
+        """Initial slow query log
+
+        Parameters
+        ----------
+        threshold : float, optional
+            minimum duration (seconds) to be recorded, by default 1.0
+        explain : bool, optional
+            capture EXPLAIN plan of slow SELECT statements, by default True
+        max_records : int, optional
+            keep only the latest max_records records, by default 1000
+        stack_limit : int, optional
+            number of call-site frames to keep, by default 5
+        """
+        self.threshold = threshold
+        self.explain = explain
+        self.stack_limit = stack_limit
+        self.lock = threading.Lock()
+        self.entries = deque(maxlen=max_records)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="coralinedb-explain") if explain else None
+
+    def record(
+        self,
+        db,
+        sql_statement: str,
+        db_name: str,
+        duration: float,
+        n_rows: int = None,
+        params=None):
+        """Record a call if it is slower than threshold
+
+        Parameters
+        ----------
+        db : BaseDB
+            database object which ran the statement (used for EXPLAIN)
+        sql_statement : str
+            SQL statement
+        db_name : str
+            database name
+        duration : float
+            duration in seconds
+        n_rows : int, optional
+            number of returned or affected rows, by default None
+        params : optional
+            statement parameters, used only for EXPLAIN and never stored, by default None
+        """
+        if duration < self.threshold:
+            return
+
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "host": db.host,
+            "db_name": db_name,
+            "sql": redact_sql(sql_statement, db.string_literal_pattern),
+            "duration": duration,
+            "rows": n_rows,
+            "stack": get_call_site(self.stack_limit),
+            "explain": None,
+        }
+        with self.lock:
+            self.entries.append(entry)
+
+        if self.executor is not None and sql_statement.lstrip().lower().startswith(("select", "with")):
+            self.executor.submit(self._explain, entry, db, sql_statement, db_name, params)
+
+    def _explain(self, entry, db, sql_statement, db_name, params):
+        """
+        capture EXPLAIN plan into a record, runs in background thread
+        """
+        try:
+            kwargs = {"params": params} if params is not None else {}
+            plan = db.explain(sql_statement, db_name, **kwargs)
+            entry["explain"] = plan.astype(str).to_dict(orient="records") if plan is not None else None
+        except Exception as e:
+            entry["explain"] = "EXPLAIN failed: {}".format(e)
+
+    def records(
+        self,
+        min_duration: float = None,
+        db_name: str = None) -> list:
+        """Get recorded slow calls
+
+        Parameters
+        ----------
+        min_duration : float, optional
+            only calls slower than this (seconds), by default None
+        db_name : str, optional
+            only calls on this database, by default None
+
+        Returns
+        -------
+        list
+            list of records (dict), the slowest first
+        """
+        with self.lock:
+            entries = list(self.entries)
+
+        if min_duration is not None:
+            entries = [e for e in entries if e["duration"] >= min_duration]
+        if db_name is not None:
+            entries = [e for e in entries if e["db_name"] == db_name]
+
+        return sorted(entries, key=lambda e: e["duration"], reverse=True)
+
+    def to_dataframe(self, **kwargs):
+        """Get recorded slow calls as dataframe, see records() for arguments
+
+        Returns
+        -------
+        pd.DataFrame
+            records
+        """
+        import pandas as pd
+        return pd.DataFrame(self.records(**kwargs))
+
+    def dump_jsonl(self, file_path: str):
+        """Write records to a JSON lines file (appended)
+
+        Parameters
+        ----------
+        file_path : str
+            path of output file
+        """
+        with self.lock:
+            entries = list(self.entries)
+
+        with open(file_path, "a", encoding="utf8") as file:
+            for entry in entries:
+                file.write(json.dumps(entry, default=str) + "\n")
+
+    def clear(self):
+        """
+        Remove all records
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def close(self):
+        """
+        Wait for pending EXPLAIN captures and stop background thread
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
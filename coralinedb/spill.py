@@ -0,0 +1,187 @@
+"""
+    Coraline DB Spill - Write chunks of a table to Parquet file and read them back lazily
+"""
+
+# import python packages
+import os
+import sqlalchemy
+import pandas as pd
+
+
+def _import_pyarrow():
+    """
+    import pyarrow which is an optional dependency
+    :return: pyarrow and pyarrow.parquet modules
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required to write or read Parquet files, please run: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def get_arrow_type(column_type):
+    """
+    map SQLAlchemy type of a column into arrow type of its values read by pandas
+    :param column_type: SQLAlchemy type instance
+    :return:
+        arrow type or None if the type cannot be mapped
+    """
+    pa, _ = _import_pyarrow()
+    affinity = getattr(column_type, '_type_affinity', None)
+
+    if affinity is None or isinstance(column_type, sqlalchemy.types.NullType):
+        return None
+    if issubclass(affinity, sqlalchemy.types.Boolean):
+        return pa.bool_()
+    if issubclass(affinity, sqlalchemy.types.Integer):
+        return pa.int64()
+    if issubclass(affinity, sqlalchemy.types.Numeric):
+        # Decimals are read as float (coerce_float=True)
+        return pa.float64()
+    if issubclass(affinity, sqlalchemy.types.String):
+        return pa.string()
+    if issubclass(affinity, sqlalchemy.types.DateTime):
+        return pa.timestamp('us', tz='UTC' if getattr(column_type, 'timezone', False) else None)
+    if issubclass(affinity, sqlalchemy.types.Date):
+        return pa.date32()
+    if issubclass(affinity, sqlalchemy.types.Time):
+        return pa.time64('us')
+    if issubclass(affinity, sqlalchemy.types.LargeBinary):
+        return pa.binary()
+
+    return None
+
+
+def write_parquet(chunks, file_path: str, compression: str = 'snappy', columns: list = None):
+    """Write an iterable of dataframes into one Parquet file, one row group per chunk
+
+    Parameters
+    ----------
+    chunks : iterable
+        iterable of pd.DataFrame with the same columns
+    file_path : str
+        path of Parquet file
+    compression : str, optional
+        Parquet compression codec, by default 'snappy'
+    columns : list, optional
+        list of (column name, SQLAlchemy type) of the source table, fixes the column types of the file,
+        by default types are inferred from the first chunk (columns of NULLs only are written as string)
+
+    Returns
+    -------
+    tuple
+        number of written rows and arrow schema (None if there is no chunk)
+    """
+    pa, pq = _import_pyarrow()
+
+    column_types = {}
+    for column_name, column_type in columns or []:
+        arrow_type = get_arrow_type(column_type)
+        if arrow_type is not None:
+            column_types[column_name] = arrow_type
+
+    writer = None
+    schema = None
+    n_rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # Types of the source table, otherwise inferred types, a column of NULLs has no type yet
+                fields = []
+                for field in table.schema:
+                    if field.name in column_types:
+                        field = field.with_type(column_types[field.name])
+                    elif pa.types.is_null(field.type):
+                        field = field.with_type(pa.string())
+                    fields.append(field)
+                schema = pa.schema(fields, metadata=table.schema.metadata)
+                writer = pq.ParquetWriter(file_path, schema, compression=compression)
+
+            # Keep types of the file for every chunk (e.g. int column with NULLs is read as float)
+            writer.write_table(table.cast(schema))
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return n_rows, schema
+
+
+class SpilledTable:
+    """
+    Handle of a table spilled to a Parquet file.
+    Data is read lazily (memory-mapped) by to_pandas() or iter_batches()
+    """
+
+    def __init__(self, file_path: str, num_rows: int, columns: list):
+        """Initial handle
+
+        Parameters
+        ----------
+        file_path : str
+            path of Parquet file
+        num_rows : int
+            number of rows
+        columns : list
+            column names
+        """
+        self.file_path = file_path
+        self.num_rows = num_rows
+        self.columns = columns
+
+    def __len__(self):
+        return self.num_rows
+
+    def __repr__(self):
+        return "SpilledTable(file_path=%r, num_rows=%d, columns=%d)" % (self.file_path, self.num_rows, len(self.columns))
+
+    def _open(self):
+        """
+        open Parquet file memory-mapped
+        :return: pyarrow.parquet.ParquetFile
+        """
+        _, pq = _import_pyarrow()
+        return pq.ParquetFile(self.file_path, memory_map=True)
+
+    def to_pandas(self, columns: list = None) -> pd.DataFrame:
+        """Read the table (or some columns) into memory
+
+        Parameters
+        ----------
+        columns : list, optional
+            columns to be read, by default all columns
+
+        Returns
+        -------
+        pd.DataFrame
+            table
+        """
+        return self._open().read(columns=columns).to_pandas()
+
+    def iter_batches(self, batch_size: int = 65536, columns: list = None):
+        """Read the table batch by batch
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            maximum number of rows per batch, by default 65536
+        columns : list, optional
+            columns to be read, by default all columns
+
+        Yields
+        ------
+        pd.DataFrame
+            batch of rows
+        """
+        for batch in self._open().iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+
+    def remove(self):
+        """
+        Delete the Parquet file
+        """
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
@@ -0,0 +1,271 @@
+"""
+    Coraline DB Transfer - Stream tables between databases without loading them into memory
+"""
+
+# import python packages
+import re
+import queue
+import threading
+import sqlalchemy
+import pandas as pd
+
+# Marks the end of source chunks in the queue
+_END_OF_TABLE = object()
+
+# Generic types by their name, see get_generic_type_name()
+GENERIC_TYPES = {
+    'BOOLEAN': sqlalchemy.types.Boolean,
+    'SMALLINT': sqlalchemy.types.SmallInteger,
+    'INTEGER': sqlalchemy.types.Integer,
+    'BIGINT': sqlalchemy.types.BigInteger,
+    'FLOAT': sqlalchemy.types.Float,
+    'NUMERIC': sqlalchemy.types.Numeric,
+    'VARCHAR': sqlalchemy.types.VARCHAR,
+    'TEXT': sqlalchemy.types.Text,
+    'DATETIME': sqlalchemy.types.DateTime,
+    'DATE': sqlalchemy.types.Date,
+    'TIME': sqlalchemy.types.Time,
+    'BLOB': sqlalchemy.types.LargeBinary,
+}
+
+
+def to_generic_type(column_type):
+    """
+    convert dialect specific SQLAlchemy type (e.g. mssql NVARCHAR, mysql TINYINT)
+    into its generic SQLAlchemy type, so it can be created on another dialect
+    :param column_type: SQLAlchemy type instance
+    :return:
+        generic SQLAlchemy type instance
+    """
+    affinity = getattr(column_type, '_type_affinity', None)
+
+    if affinity is None or isinstance(column_type, sqlalchemy.types.NullType):
+        return sqlalchemy.types.Text()
+    if issubclass(affinity, sqlalchemy.types.Boolean):
+        return sqlalchemy.types.Boolean()
+
+    # Concrete classes first, affinity is the most generic base class (e.g. Integer of BIGINT)
+    if isinstance(column_type, sqlalchemy.types.BigInteger):
+        return sqlalchemy.types.BigInteger()
+    if isinstance(column_type, sqlalchemy.types.SmallInteger):
+        return sqlalchemy.types.SmallInteger()
+    if issubclass(affinity, sqlalchemy.types.Integer):
+        return sqlalchemy.types.Integer()
+    if isinstance(column_type, sqlalchemy.types.Float):
+        # Single precision (e.g. REAL) has at most 24 bits of mantissa
+        precision = getattr(column_type, 'precision', None)
+        return sqlalchemy.types.Float(precision=precision if precision and precision <= 24 else 53)
+    if issubclass(affinity, sqlalchemy.types.Numeric):
+        if column_type.precision is None:
+            # Unparameterized NUMERIC is created with scale 0 on MySQL and MSSQL
+            return sqlalchemy.types.Float(precision=53)
+        return sqlalchemy.types.Numeric(precision=column_type.precision, scale=column_type.scale)
+    if issubclass(affinity, sqlalchemy.types.String):
+        length = getattr(column_type, 'length', None)
+        return sqlalchemy.types.VARCHAR(length=length) if length else sqlalchemy.types.Text()
+    if issubclass(affinity, sqlalchemy.types.DateTime):
+        return sqlalchemy.types.DateTime(timezone=bool(getattr(column_type, 'timezone', False)))
+    if issubclass(affinity, (sqlalchemy.types.Date, sqlalchemy.types.Time)):
+        return affinity()
+    if issubclass(affinity, sqlalchemy.types.LargeBinary):
+        return sqlalchemy.types.LargeBinary()
+
+    return sqlalchemy.types.Text()
+
+
+def get_generic_type_name(column_type) -> str:
+    """
+    get name of generic SQLAlchemy type of a column (e.g. 'VARCHAR(10)'), which can be parsed by from_generic_type_name()
+    :param column_type: SQLAlchemy type instance
+    :return:
+        type name (str)
+    """
+    generic_type = to_generic_type(column_type)
+    name = str(generic_type)
+    if isinstance(generic_type, sqlalchemy.types.DateTime) and generic_type.timezone:
+        name += ' WITH TIME ZONE'
+    return name
+
+
+def from_generic_type_name(name: str):
+    """
+    create generic SQLAlchemy type from its name written by get_generic_type_name()
+    :param name: type name (str)
+    :return:
+        SQLAlchemy type instance or None if the name is unknown
+    """
+    match = re.match(r'^(\w+)(?:\(([\d, ]*)\))?( WITH TIME ZONE)?$', name.strip())
+    if match is None or match.group(1).upper() not in GENERIC_TYPES:
+        return None
+
+    type_class = GENERIC_TYPES[match.group(1).upper()]
+    args = [int(arg) for arg in match.group(2).split(',')] if match.group(2) else []
+
+    if type_class is sqlalchemy.types.DateTime:
+        return type_class(timezone=match.group(3) is not None)
+    return type_class(*args)
+
+
+def _connect(db, db_name: str):
+    """
+    create connection of a database, raise if it cannot be created
+    :param db: database object
+    :param db_name: database name (str)
+    :return: connection
+    """
+    created = db.create_connection(db_name)
+    if created is None:
+        # create_connection() gives up after its retries
+        raise ConnectionError("cannot connect to database %s on %s" % (db_name, db.host))
+    return created[1]
+
+
+def get_generic_dtypes(db, db_name: str, table_name: str) -> dict:
+    """Reflect columns of a table and map them to generic SQLAlchemy types
+
+    Parameters
+    ----------
+    db : BaseDB
+        database object
+    db_name : str
+        database name
+    table_name : str
+        table name
+
+    Returns
+    -------
+    dict
+        dict of column name and generic SQLAlchemy type (can be used as dtype of to_sql)
+    """
+    connection = _connect(db, db_name)
+    try:
+        columns = sqlalchemy.inspect(connection).get_columns(table_name)
+    finally:
+        connection.close()
+
+    return {col['name']: to_generic_type(col['type']) for col in columns}
+
+
+def copy_table(
+    src_db,
+    src_db_name: str,
+    src_table: str,
+    dst_db,
+    dst_db_name: str,
+    dst_table: str,
+    chunksize: int = 50000,
+    queue_size: int = 4,
+    if_exists: str = 'replace',
+    dtype: dict = None) -> int:
+    """Copy a table from one database to another (possibly of different backend).
+    Source rows are streamed with a server-side cursor in chunks by a reader thread,
+    and written to the destination by a writer thread. Both threads are connected by
+    a bounded queue, so at most queue_size + 2 chunks are held in memory.
+
+    Parameters
+    ----------
+    src_db : BaseDB
+        source database object
+    src_db_name : str
+        source database name
+    src_table : str
+        source table name
+    dst_db : BaseDB
+        destination database object
+    dst_db_name : str
+        destination database name
+    dst_table : str
+        destination table name
+    chunksize : int, optional
+        number of rows per chunk, by default 50000
+    queue_size : int, optional
+        maximum number of chunks waiting to be written, by default 4
+    if_exists : str, optional
+        How to behave if the destination table already exists ({‘fail’, ‘replace’, ‘append’}), by default 'replace'
+    dtype : dict, optional
+        column types of destination table, by default mapped from source table columns
+
+    Returns
+    -------
+    int
+        number of copied rows
+    """
+    if dtype is None:
+        dtype = get_generic_dtypes(src_db, src_db_name, src_table)
+
+    chunks = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    n_rows = [0]
+
+    def read():
+        connection = None
+        try:
+            connection = _connect(src_db, src_db_name)
+            stream = connection.execution_options(stream_results=True)
+            sql = 'SELECT * FROM %s' % src_table
+            for chunk in pd.read_sql(sql, stream, coerce_float=True, chunksize=chunksize):
+                # Wait for free slot, but give up when writer has failed
+                while not stop.is_set():
+                    try:
+                        chunks.put(chunk, timeout=1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set():
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            try:
+                if connection is not None:
+                    connection.close()
+            finally:
+                # Always wake the writer, it is blocked on chunks.get()
+                chunks.put(_END_OF_TABLE)
+
+    def write():
+        connection = None
+        mode = if_exists
+        try:
+            connection = _connect(dst_db, dst_db_name)
+            while True:
+                chunk = chunks.get()
+                if chunk is _END_OF_TABLE or stop.is_set():
+                    break
+                chunk.to_sql(name=dst_table, con=connection, index=False, if_exists=mode, dtype=dtype,
+                             method=dst_db.bulk_insert_method)
+                n_rows[0] += len(chunk)
+                mode = 'append'
+
+            # Source table is empty, create an empty destination table anyway
+            if mode == if_exists and not stop.is_set():
+                pd.DataFrame(columns=list(dtype)).to_sql(
+                    name=dst_table, con=connection, index=False, if_exists=mode, dtype=dtype)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            if connection is not None:
+                connection.close()
+
+    reader = threading.Thread(target=read, name='coralinedb-copy-reader', daemon=True)
+    writer = threading.Thread(target=write, name='coralinedb-copy-writer', daemon=True)
+    reader.start()
+    writer.start()
+    writer.join()
+
+    # Unblock reader if writer stopped early
+    stop.set()
+    while reader.is_alive():
+        try:
+            chunks.get(timeout=1)
+        except queue.Empty:
+            pass
+    reader.join()
+
+    if errors:
+        raise errors[0]
+
+    return n_rows[0]
@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 from math import ceil
 from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
 
 def get_simplified_column_name_and_delimiter(file_path):
     """
@@ -176,19 +177,159 @@ def convert_df_datatype_to_sqlalchemy_datatype(df):
     return dtype_dict
 
 
-def get_datatype_each_col(df, file_path):
+def get_sqlalchemy_datatype_from_dtypes(df, size_strings=True):
+    """
+    map pandas data type of each column into SQLAlchemy data type without scanning values,
+    only lengths of string columns are measured
+    (integers keep their width, floats are double precision, nullable extension types map by their kind)
+    :param df: dataframe (df)
+    :param size_strings: size VARCHAR by the longest value, otherwise strings are TEXT, e.g. when
+        later rows may be longer than the ones in df (bool)
+    :return:
+        dict of data type of each column in SQLAlchemy standard (dict),
+        columns of other types are left out to use default of pandas
+    """
+
+    dtype_dict = {}
+
+    for col_name in df.columns:
+        series = df[col_name]
+        kind = getattr(series.dtype, 'kind', 'O')
+
+        if kind == 'b':
+            dtype_dict[col_name] = sqlalchemy.types.Boolean()
+        elif kind == 'i':
+            if series.dtype.itemsize <= 2:
+                dtype_dict[col_name] = sqlalchemy.types.SmallInteger()
+            elif series.dtype.itemsize <= 4:
+                dtype_dict[col_name] = sqlalchemy.types.Integer()
+            else:
+                dtype_dict[col_name] = sqlalchemy.types.BigInteger()
+        elif kind == 'u':
+            # Unsigned values need the next wider signed type
+            if series.dtype.itemsize <= 2:
+                dtype_dict[col_name] = sqlalchemy.types.Integer()
+            else:
+                dtype_dict[col_name] = sqlalchemy.types.BigInteger()
+        elif kind == 'f':
+            dtype_dict[col_name] = sqlalchemy.types.Float(precision=53 if series.dtype.itemsize > 4 else 24)
+        elif kind == 'M':
+            dtype_dict[col_name] = sqlalchemy.types.DateTime(timezone=getattr(series.dtype, 'tz', None) is not None)
+        elif kind in ('O', 'U', 'S') and pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            if not size_strings:
+                dtype_dict[col_name] = sqlalchemy.types.Text()
+                continue
+
+            lengths = series.dropna().str.len()
+            max_len = int(lengths.max()) if len(lengths) > 0 else 0
+
+            # check the limit of varhcar, if the length exeeds, then use TEXT
+            if max_len > 1000:
+                dtype_dict[col_name] = sqlalchemy.types.Text()
+            else:
+                dtype_dict[col_name] = sqlalchemy.types.VARCHAR(length=max(10, ceil(max_len / 10) * 10))
+
+    return dtype_dict
+
+
+def convert_df_to_sqlalchemy_datatype(df, dtype_dict):
+    """
+    coerce columns of dataframe to given SQLAlchemy data types in a vectorized pass, so
+    bad values are found before anything is written to database
+    :param df: dataframe (df)
+    :param dtype_dict: dict of data type of each column in SQLAlchemy standard (dict)
+    :return:
+        coerced copy of dataframe (df)
+    """
+    df = df.copy()
+
+    for col_name in df.columns:
+        if col_name not in dtype_dict:
+            raise ValueError("column {} does not exist in target table".format(col_name))
+
+        affinity = getattr(dtype_dict[col_name], '_type_affinity', None)
+        series = df[col_name]
+        try:
+            if affinity is None:
+                continue
+            elif issubclass(affinity, sqlalchemy.types.Boolean):
+                continue
+            elif issubclass(affinity, sqlalchemy.types.Integer):
+                series = pd.to_numeric(series)
+                if series.dtype.kind == 'f':
+                    if (series.dropna() % 1 != 0).any():
+                        raise ValueError("non-integer values would be truncated")
+                    series = series.astype('Int64')
+            elif issubclass(affinity, sqlalchemy.types.Numeric):
+                series = pd.to_numeric(series)
+            elif issubclass(affinity, (sqlalchemy.types.DateTime, sqlalchemy.types.Date)):
+                if 'datetime' not in str(series.dtype):
+                    series = pd.to_datetime(series)
+            elif issubclass(affinity, sqlalchemy.types.String):
+                if 'object' not in str(series.dtype):
+                    series = series.astype(str).where(series.notna(), None)
+        except (ValueError, TypeError) as e:
+            raise ValueError("column {} cannot be converted to {}: {}".format(col_name, dtype_dict[col_name], e))
+
+        df[col_name] = series
+
+    return df
+
+
+def _get_datatype_column_shard(df):
+    """
+    detect data types of a subset of columns, runs in a worker process of get_datatype_each_col()
+    :param df: dataframe with subset of columns (df)
+    :return:
+        dataframe of columns whose data type was converted (df)
+        dict of data type of each column in SQLAlchemy standard (dict)
+    """
+    original_dtypes = df.dtypes.to_dict()
+
+    df = get_detected_column_types(df)
+    dtype_dict = convert_df_datatype_to_sqlalchemy_datatype(df)
+
+    # Send back only converted columns to keep inter-process traffic small
+    converted = [c for c in df.columns if df[c].dtype != original_dtypes[c]]
+
+    return df[converted], dtype_dict
+
+
+def get_datatype_each_col(df, file_path, n_jobs=None):
     """
     main function to call sub-function in order to find data type and data length for each column
     :param df: dataframe (df)
     :param file_path: path_to_file (str)
+    :param n_jobs: number of worker processes, columns are split into n_jobs shards and
+        detected in parallel; -1 uses all cores, None or 1 runs in this process (int)
+        (on spawn-based platforms, call it under if __name__ == "__main__")
     :return:
         dict of data type of each column in SQLAlchemy standard (dict)
     """
 
-    df = get_detected_column_types(df)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
 
-    dtype_dict = convert_df_datatype_to_sqlalchemy_datatype(df)
+    if n_jobs is None or n_jobs <= 1 or len(df.columns) < 2:
+        df = get_detected_column_types(df)
+
+        dtype_dict = convert_df_datatype_to_sqlalchemy_datatype(df)
 
-    del df
+        del df
 
-    return dtype_dict
\ No newline at end of file
+        return dtype_dict
+
+    # Split columns into shards, each column is sent to exactly one worker
+    n_jobs = min(n_jobs, len(df.columns))
+    shards = [idx for idx in np.array_split(np.arange(len(df.columns)), n_jobs) if len(idx) > 0]
+
+    dtype_dict = {}
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        for converted, shard_dtype_dict in executor.map(_get_datatype_column_shard, [df.iloc[:, idx] for idx in shards]):
+            # Convert columns in place, the same as get_detected_column_types()
+            for c in converted.columns:
+                df[c] = converted[c]
+            dtype_dict.update(shard_dtype_dict)
+
+    # Keep column order of dataframe
+    return {c: dtype_dict[c] for c in df.columns}
@@ -0,0 +1,32 @@
+from coralinedb import DuckDB, MySQLDB
+
+host = ''
+username = ''
+password = ''
+db_name = ''
+
+# Initial objects, DuckDB runs in this process (in-memory database)
+mysql_db = MySQLDB(host, username, password)
+local_db = DuckDB()
+
+# Load tables from server
+orders = mysql_db.load_table(db_name, 'orders')
+customers = mysql_db.load_table(db_name, 'customers')
+
+# Register dataframes as views (no copy)
+local_db.register(orders, 'orders')
+local_db.register(customers, 'customers')
+
+# Join and aggregate locally
+df = local_db.query('''
+    SELECT c.country, COUNT(*) AS n_orders, SUM(o.amount) AS amount
+    FROM orders o JOIN customers c ON o.customer_id = c.id
+    GROUP BY c.country
+''')
+print(df)
+
+# Print all tables (registered views included)
+print(local_db.get_tables())
+
+# Save a result as a table
+local_db.save_table(df, None, 'orders_by_country')
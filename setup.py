@@ -51,8 +51,8 @@ setup(
     author='Jiranun J.',
     author_email='jiranun@coraline.co.th',
     url='https://www.coraline.co.th',
-    keywords=['mysql', 'database', 'db', 'coraline', 'mssql', 'data', 'postgresql', 'postgres'],
-    python_requires='>=3.6',
+    keywords=['mysql', 'database', 'db', 'coraline', 'mssql', 'data', 'postgresql', 'postgres', 'duckdb'],
+    python_requires='>=3.7',
     classifiers=['Programming Language :: Python',
                  'Programming Language :: SQL',
                  'Development Status :: 4 - Beta',
@@ -69,7 +69,7 @@ setup(
     #                   ],
     entry_points={
         'console_scripts': [
-            'coralinedb=coralinedb.coralinedb:print_help',
+            'coralinedb=coralinedb.cli:main',
         ],
     },
     # include_dirs=[numpy.get_include()]
@@ -0,0 +1,64 @@
+"""
+    Fixtures of Coraline DB tests, every test gets its own DuckDB database files
+"""
+
+# import python packages
+import threading
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("duckdb_engine")
+
+from coralinedb import DuckDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    DuckDB database object in a temporary directory
+    """
+    return DuckDB(str(tmp_path))
+
+
+@pytest.fixture
+def other_db(tmp_path):
+    """
+    second DuckDB database object, e.g. destination of copy_table
+    """
+    directory = tmp_path / "other"
+    directory.mkdir()
+    return DuckDB(str(directory))
+
+
+def _run_with_timeout(fn, timeout=30):
+    """
+    run fn in a daemon thread, fail instead of hanging the test run
+    :param fn: function without arguments
+    :param timeout: seconds to wait (float)
+    :return: result of fn
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    if thread.is_alive():
+        pytest.fail("call did not return within %s seconds" % timeout)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+@pytest.fixture
+def run_with_timeout():
+    """
+    runner which fails a call that hangs, see _run_with_timeout()
+    """
+    return _run_with_timeout
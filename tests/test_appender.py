@@ -0,0 +1,82 @@
+"""
+    Tests of Appender
+"""
+
+# import python packages
+import time
+import pandas as pd
+import pytest
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("condition was not met within %s seconds" % timeout)
+        time.sleep(0.01)
+
+
+def _failing(save_table, n_failures):
+    """
+    wrap save_table to fail its first n_failures calls
+    """
+    calls = {"n": 0}
+
+    def wrapper(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] <= n_failures:
+            raise RuntimeError("write failed")
+        return save_table(*args, **kwargs)
+
+    return wrapper
+
+
+def test_appender_writes_in_batches(db):
+    # Rows below max_rows wait for max_latency, close() writes them
+    with db.appender("", "events", max_rows=100, max_latency=60) as appender:
+        for i in range(10):
+            appender.append(pd.DataFrame({"id": range(i * 20, i * 20 + 20)}))
+
+    metrics = appender.metrics()
+    assert metrics["rows_flushed"] == 200
+    assert 1 <= metrics["flushes"] <= 2
+    assert db.get_count("", "events") == 200
+
+
+def test_appender_retries_failed_write(db, monkeypatch):
+    monkeypatch.setattr(db, "save_table", _failing(db.save_table, 1))
+
+    appender = db.appender("", "events", max_latency=0.01, retry_interval=0.1)
+    appender.append(pd.DataFrame({"id": range(50)}))
+    _wait_for(lambda: appender.metrics()["rows_flushed"] == 50)
+
+    # Error is cleared after the rows are written by the retry
+    appender.append(pd.DataFrame({"id": range(50, 60)}))
+    appender.close()
+
+    metrics = appender.metrics()
+    assert metrics["failed_flushes"] == 1
+    assert metrics["failed_rows"] == 0
+    assert db.query("SELECT id FROM events ORDER BY id")["id"].tolist() == list(range(60))
+
+
+def test_appender_raises_error_and_keeps_rows(db, monkeypatch):
+    monkeypatch.setattr(db, "save_table", _failing(db.save_table, 100))
+
+    appender = db.appender("", "events", max_latency=60, retry_interval=60)
+    appender.append(pd.DataFrame({"id": range(30)}))
+
+    with pytest.raises(RuntimeError, match="write failed"):
+        appender.flush()
+    assert appender.metrics()["buffered_rows"] == 30
+
+    # close() writes once more, rows which still fail stay in buffer
+    with pytest.raises(RuntimeError, match="write failed"):
+        appender.close()
+
+    metrics = appender.metrics()
+    assert metrics["failed_rows"] == 30
+    assert metrics["rows_flushed"] == 0
+
+    with pytest.raises(RuntimeError, match="closed"):
+        appender.append(pd.DataFrame({"id": [1]}))
@@ -0,0 +1,71 @@
+"""
+    Tests of appending to existing tables with cached table schemas
+"""
+
+# import python packages
+import pandas as pd
+import pytest
+import sqlalchemy
+
+
+@pytest.fixture
+def table(db):
+    db.save_table(pd.DataFrame({"id": [1, 2], "name": ["a", "b"]}), "", "items")
+    return "items"
+
+
+def test_append_uses_cached_schema(db, table, monkeypatch):
+    db.save_table(pd.DataFrame({"id": [3], "name": ["c"]}), "", table, if_exists="append")
+    assert ("", None, table) in db.schema_cache
+
+    # The table is not reflected again
+    def no_inspect(*args, **kwargs):
+        raise AssertionError("table was reflected")
+
+    monkeypatch.setattr(sqlalchemy, "inspect", no_inspect)
+    n_rows = db.save_table(pd.DataFrame({"id": ["4"], "name": ["d"]}), "", table, if_exists="append")
+
+    assert n_rows == 1
+    assert db.query("SELECT id FROM items ORDER BY id")["id"].tolist() == [1, 2, 3, 4]
+
+
+def test_append_rejects_truncated_values(db, table):
+    with pytest.raises(ValueError):
+        db.save_table(pd.DataFrame({"id": [1.5], "name": ["x"]}), "", table, if_exists="append")
+
+    assert db.get_count("", table) == 2
+
+
+def test_append_after_alter_in_session(db, table):
+    db.save_table(pd.DataFrame({"id": [3], "name": ["c"]}), "", table, if_exists="append")
+
+    with db.session("") as session:
+        session.execute("ALTER TABLE items ADD COLUMN price DOUBLE")
+
+    db.save_table(pd.DataFrame({"id": [4], "name": ["d"], "price": [9.5]}), "", table, if_exists="append")
+
+    result = db.query("SELECT * FROM items WHERE id = 4")
+    assert result["price"].tolist() == [9.5]
+
+
+def test_append_after_alter_outside_coralinedb(db, table):
+    db.save_table(pd.DataFrame({"id": [3], "name": ["c"]}), "", table, if_exists="append")
+
+    # Altered by a plain connection, the cached schema is stale
+    engine, connection = db.create_connection("")
+    connection.execute(sqlalchemy.text("ALTER TABLE items ADD COLUMN price DOUBLE"))
+    connection.close()
+
+    n_rows = db.save_table(pd.DataFrame({"id": [4], "name": ["d"], "price": [9.5]}), "", table, if_exists="append")
+
+    assert n_rows == 1
+    assert [name for name, _ in db.get_table_schema("", table)] == ["id", "name", "price"]
+
+
+def test_append_creates_table_with_unsized_strings(db):
+    db.save_table(pd.DataFrame({"name": ["a"]}), "", "log", if_exists="append")
+    db.save_table(pd.DataFrame({"name": ["x" * 500]}), "", "log", if_exists="append")
+
+    column_type = dict(db.get_table_schema("", "log"))["name"]
+    assert getattr(column_type, "length", None) is None
+    assert db.query("SELECT max(length(name)) AS n FROM log")["n"].tolist() == [500]
@@ -0,0 +1,98 @@
+"""
+    Tests of single flight deduplication
+"""
+
+# import python packages
+import threading
+import time
+
+from coralinedb.singleflight import SingleFlight
+
+
+def _run_concurrently(fn, n_threads):
+    barrier = threading.Barrier(n_threads)
+    results = [None] * n_threads
+
+    def target(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    return results
+
+
+def test_single_flight_runs_call_once():
+    group = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    results = _run_concurrently(lambda: group.do("key", slow), 8)
+
+    assert len(calls) == 1
+    assert all(result == 42 for result, _ in results)
+    assert sum(shared for _, shared in results) == 8
+
+
+def test_single_flight_shares_error():
+    group = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise KeyError("missing")
+
+    def call():
+        try:
+            group.do("key", failing)
+        except KeyError as e:
+            return e
+
+    errors = _run_concurrently(call, 4)
+
+    assert all(isinstance(e, KeyError) for e in errors)
+    assert group.calls == {}
+
+
+def test_query_is_deduplicated(db, monkeypatch):
+    db.single_flight = True
+    create_connection = db.create_connection
+    calls = []
+
+    def slow_create_connection(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.2)
+        return create_connection(*args, **kwargs)
+
+    monkeypatch.setattr(db, "create_connection", slow_create_connection)
+
+    results = _run_concurrently(lambda: db.query("SELECT 42 AS answer", ""), 6)
+
+    assert len(calls) == 1
+    assert all(df["answer"].tolist() == [42] for df in results)
+
+    # Each caller gets its own copy of a shared dataframe
+    results[0]["answer"] = 0
+    assert results[1]["answer"].tolist() == [42]
+
+
+def test_query_is_not_deduplicated_by_default(db, monkeypatch):
+    create_connection = db.create_connection
+    calls = []
+
+    def counting_create_connection(*args, **kwargs):
+        calls.append(1)
+        return create_connection(*args, **kwargs)
+
+    monkeypatch.setattr(db, "create_connection", counting_create_connection)
+
+    _run_concurrently(lambda: db.query("SELECT 42 AS answer", ""), 4)
+
+    assert len(calls) == 4
@@ -0,0 +1,73 @@
+"""
+    Tests of copy_table
+"""
+
+# import python packages
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coralinedb import copy_table
+
+
+def _no_connection(*args, **kwargs):
+    # create_connection() returns None after its retries
+    return None
+
+
+@pytest.fixture
+def src_table(db):
+    df = pd.DataFrame({"id": range(2500), "name": ["row %d" % i for i in range(2500)]})
+    db.save_table(df, "", "src")
+    return df
+
+
+def test_copy_table(db, other_db, src_table, run_with_timeout):
+    n_rows = run_with_timeout(lambda: copy_table(db, "", "src", other_db, "", "dst", chunksize=1000))
+
+    assert n_rows == len(src_table)
+    result = other_db.query("SELECT * FROM dst ORDER BY id")
+    pd.testing.assert_frame_equal(result, src_table, check_dtype=False)
+
+
+def test_copy_empty_table_creates_destination(db, other_db, run_with_timeout):
+    db.execute("CREATE TABLE src (id INTEGER, name VARCHAR)", "")
+
+    n_rows = run_with_timeout(lambda: copy_table(db, "", "src", other_db, "", "dst"))
+
+    assert n_rows == 0
+    assert list(other_db.query("SELECT * FROM dst").columns) == ["id", "name"]
+
+
+def test_copy_table_source_connection_fails(db, other_db, src_table, monkeypatch, run_with_timeout):
+    monkeypatch.setattr(db, "create_connection", _no_connection)
+
+    with pytest.raises(ConnectionError):
+        run_with_timeout(lambda: copy_table(db, "", "src", other_db, "", "dst"))
+
+
+def test_copy_table_reader_connection_fails(db, other_db, src_table, monkeypatch, run_with_timeout):
+    # dtype is given, so only the reader thread connects to the source
+    dtype = {"id": sqlalchemy.types.BigInteger(), "name": sqlalchemy.types.Text()}
+    monkeypatch.setattr(db, "create_connection", _no_connection)
+
+    with pytest.raises(ConnectionError):
+        run_with_timeout(lambda: copy_table(db, "", "src", other_db, "", "dst", dtype=dtype))
+
+    assert other_db.get_table_schema("", "dst") is None
+
+
+def test_copy_table_destination_connection_fails(db, other_db, src_table, monkeypatch, run_with_timeout):
+    monkeypatch.setattr(other_db, "create_connection", _no_connection)
+
+    # Reader must not stay blocked on the full queue
+    with pytest.raises(ConnectionError):
+        run_with_timeout(lambda: copy_table(db, "", "src", other_db, "", "dst", chunksize=100, queue_size=1))
+
+
+def test_copy_table_write_fails(db, other_db, src_table, run_with_timeout):
+    other_db.execute("CREATE TABLE dst (id INTEGER)", "")
+
+    with pytest.raises(ValueError):
+        run_with_timeout(lambda: copy_table(db, "", "src", other_db, "", "dst", chunksize=100,
+                                            queue_size=1, if_exists="fail"))